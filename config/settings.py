@@ -82,6 +82,19 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Shared by the web process and run_scraper, so saves made by the scraper
+# invalidate the dashboard responses the web process has cached
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache',
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
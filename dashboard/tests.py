@@ -1,3 +1,92 @@
-from django.test import TestCase
+from datetime import date
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from feed.models import ArticleEntity, NewsArticleModel
+from feed.services.article_queries import InvalidCursor, decode_cursor, encode_cursor, list_articles
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+class CursorTests(SimpleTestCase):
+    def test_round_trip(self):
+        cursor = encode_cursor(date(2024, 5, 1), 42)
+        self.assertNotIn("=", cursor)
+        self.assertEqual(decode_cursor(cursor), (date(2024, 5, 1), 42))
+
+    def test_malformed_cursors_are_rejected(self):
+        for cursor in ("", "not-a-cursor", encode_cursor(date(2024, 5, 1), 1)[:-3], "é"):
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(InvalidCursor):
+                    decode_cursor(cursor)
+
+
+class ListArticlesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Three articles share a day so pages have to break ties on id
+        cls.articles = [
+            NewsArticleModel.objects.create(
+                source="reuters" if n % 2 else "cnbc", title=f"Title {n}", link=f"https://example.com/{n}",
+                published=published, full_content="Body",
+            )
+            for n, published in enumerate([
+                date(2024, 5, 1), date(2024, 5, 2), date(2024, 5, 2), date(2024, 5, 2), date(2024, 5, 3),
+            ])
+        ]
+        ArticleEntity.objects.create(article=cls.articles[1], symbol="AAPL", published=date(2024, 5, 2))
+
+    def walk(self, **filters):
+        links, cursor = [], None
+        while True:
+            page = list_articles(cursor=cursor, limit=2, **filters)
+            links.extend(row["link"] for row in page["results"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return links
+
+    def test_pages_cover_every_article_once_newest_first(self):
+        expected = [article.link for article in sorted(
+            self.articles, key=lambda article: (article.published, article.id), reverse=True
+        )]
+        self.assertEqual(self.walk(), expected)
+
+    def test_rows_carry_list_fields_only(self):
+        row = list_articles(limit=1)["results"][0]
+        self.assertEqual(set(row), {"id", "source", "title", "link", "published"})
+
+    def test_filters(self):
+        self.assertEqual(len(self.walk(source="reuters")), 2)
+        self.assertEqual(len(self.walk(since=date(2024, 5, 2), until=date(2024, 5, 2))), 3)
+        self.assertEqual(self.walk(symbol="aapl"), ["https://example.com/1"])
+
+    def test_limit_is_clamped(self):
+        self.assertEqual(list_articles(limit=0)["limit"], 1)
+        self.assertEqual(list_articles(limit=10_000)["limit"], 100)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ArticleViewsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.article = NewsArticleModel.objects.create(
+            source="reuters", title="Rates held", link="https://example.com/rates",
+            published=date(2024, 5, 1), full_content="Body",
+        )
+
+    def test_articles(self):
+        response = self.client.get(reverse("dashboard:articles"), {"limit": 5})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["title"] for row in response.json()["results"]], ["Rates held"])
+
+    def test_bad_parameters_are_400(self):
+        for params in ({"cursor": "nope"}, {"limit": "ten"}, {"since": "yesterday"}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(reverse("dashboard:articles"), params).status_code, 400)
+
+    def test_article_detail(self):
+        response = self.client.get(reverse("dashboard:article-detail", args=[self.article.pk]))
+        self.assertEqual(response.json()["full_content"], "Body")
+        missing = self.client.get(reverse("dashboard:article-detail", args=[self.article.pk + 1]))
+        self.assertEqual(missing.status_code, 404)
@@ -0,0 +1,11 @@
+from django.urls import path
+
+from dashboard import views
+
+app_name = "dashboard"
+
+urlpatterns = [
+    path("api/articles/", views.articles, name="articles"),
+    path("api/articles/<int:pk>/", views.article_detail, name="article-detail"),
+    path("api/search/", views.search, name="search"),
+]
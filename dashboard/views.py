@@ -1,3 +1,73 @@
-from django.shortcuts import render
+from django.http import JsonResponse
+from django.utils.dateparse import parse_date
+from django.views.decorators.http import require_GET
 
-# Create your views here.
+from feed.services.article_queries import cached, get_article, list_articles
+from feed.services.search import search_articles
+
+
+def _int_param(request, name: str, default: int) -> int:
+    try:
+        return int(request.GET.get(name, default))
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer")
+
+
+def _date_param(request, name: str):
+    value = request.GET.get(name)
+    if not value:
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValueError(f"{name} must be a date (YYYY-MM-DD)")
+    return parsed
+
+
+@require_GET
+def articles(request):
+    """Latest articles, filterable by source, date range and symbol, keyset paginated"""
+    try:
+        params = {
+            "source": request.GET.get("source") or None,
+            "since": _date_param(request, "since"),
+            "until": _date_param(request, "until"),
+            "symbol": request.GET.get("symbol") or None,
+            "cursor": request.GET.get("cursor") or None,
+            "limit": _int_param(request, "limit", 20),
+        }
+        return JsonResponse(cached("list", params, lambda: list_articles(**params)))
+    except ValueError as e:
+        # Bad parameters and malformed cursors alike
+        return JsonResponse({"error": str(e)}, status=400)
+
+
+@require_GET
+def article_detail(request, pk: int):
+    article = cached("detail", {"id": pk}, lambda: get_article(pk))
+    if article is None:
+        return JsonResponse({"error": "Article not found"}, status=404)
+    return JsonResponse(article)
+
+
+@require_GET
+def search(request):
+    """Ranked full-text search over article titles and bodies"""
+    query = request.GET.get("q", "").strip()
+    if not query:
+        return JsonResponse({"error": "q is required"}, status=400)
+
+    try:
+        page = _int_param(request, "page", 1)
+        page_size = _int_param(request, "page_size", 20)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    source = request.GET.get("source") or None
+    return JsonResponse(cached(
+        "search",
+        {"q": query, "page": page, "page_size": page_size, "source": source},
+        lambda: search_articles(query, page, page_size, source=source),
+    ))
@@ -1,3 +1,48 @@
 from django.contrib import admin
 
-# Register your models here.
+from feed.models import ScrapeRun, ScrapeItem, ArticleEntity, DuplicateArticle
+
+
+class ScrapeItemInline(admin.TabularInline):
+    model = ScrapeItem
+    extra = 0
+    can_delete = False
+    fields = ("source", "succeeded", "duration", "fetched", "skipped", "extracted", "saved", "created",
+              "failed", "bytes_downloaded", "error_classes")
+    readonly_fields = fields
+
+
+@admin.register(ScrapeRun)
+class ScrapeRunAdmin(admin.ModelAdmin):
+    list_display = ("started_at", "duration", "sites_succeeded", "sites_total", "articles_fetched",
+                    "articles_created", "articles_failed", "articles_per_second")
+    date_hierarchy = "started_at"
+    ordering = ("-started_at",)
+    inlines = [ScrapeItemInline]
+
+    @admin.display(description="Articles/s")
+    def articles_per_second(self, obj):
+        return round(obj.articles_extracted / obj.duration, 2) if obj.duration else None
+
+
+@admin.register(ScrapeItem)
+class ScrapeItemAdmin(admin.ModelAdmin):
+    list_display = ("source", "run", "succeeded", "duration", "fetched", "extracted", "created", "failed")
+    list_filter = ("source", "succeeded")
+    ordering = ("-run__started_at", "-duration")
+
+
+@admin.register(ArticleEntity)
+class ArticleEntityAdmin(admin.ModelAdmin):
+    list_display = ("symbol", "article", "mentions", "published")
+    list_filter = ("symbol",)
+    ordering = ("-published", "symbol")
+    raw_id_fields = ("article",)
+
+
+@admin.register(DuplicateArticle)
+class DuplicateArticleAdmin(admin.ModelAdmin):
+    list_display = ("title", "source", "canonical", "similarity", "detected_at")
+    list_filter = ("source",)
+    ordering = ("-detected_at",)
+    raw_id_fields = ("canonical",)
@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from pathlib import Path
+from string import Template
+import asyncio
+import httpx
+import random
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+PARAGRAPHS = [
+    "Shares of the company rose in early trading after the quarterly report beat analyst estimates "
+    "on both revenue and margins, lifting the broader technology index with it.",
+    "Executives pointed to strong demand for data-center hardware and said supply constraints that "
+    "weighed on the previous two quarters had largely eased.",
+    "Analysts cautioned that guidance for the next quarter remained conservative and that currency "
+    "headwinds could offset part of the growth in international markets.",
+    "The company also announced an expanded buyback programme and reiterated its plan to keep "
+    "investing in research while holding operating expenses flat.",
+]
+
+
+def load_fixture(name: str) -> Template:
+    return Template((FIXTURES_DIR / name).read_text(encoding="utf-8"))
+
+
+class FixtureTransport(httpx.AsyncBaseTransport):
+    """Serves the recorded fixtures for any host without touching the network.
+
+    Routes:
+        /rss.xml           RSS feed with ``articles`` items
+        /sitemap.xml       news sitemap with ``articles`` urls
+        /listing           HTML listing page with ``articles`` links
+        /article/<slug>    article page
+
+    ``latency`` adds a fixed delay to every response so runs behave like a
+    slow network without being one.
+    """
+
+    def __init__(self, articles: int = 50, latency: float = 0.0, paragraphs: int = 12):
+        self.articles = articles
+        self.latency = latency
+        self.paragraphs = paragraphs
+        self.requests = 0
+        self.bytes_served = 0
+        self.now = datetime.now(timezone.utc).replace(microsecond=0)
+        self.templates = {
+            name: load_fixture(name)
+            for name in ("rss.xml", "rss_item.xml", "sitemap.xml", "sitemap_item.xml",
+                         "listing.html", "article.html")
+        }
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        host = request.url.host
+        path = request.url.path
+
+        if path == "/rss.xml":
+            body, content_type = self.render_rss(host), "application/rss+xml"
+        elif path == "/sitemap.xml":
+            body, content_type = self.render_sitemap(host), "application/xml"
+        elif path == "/listing":
+            body, content_type = self.render_listing(host), "text/html; charset=utf-8"
+        elif path.startswith("/article/"):
+            body, content_type = self.render_article(host, path.rsplit("/", 1)[-1]), "text/html; charset=utf-8"
+        else:
+            return httpx.Response(404, request=request)
+
+        content = body.encode("utf-8")
+        self.requests += 1
+        self.bytes_served += len(content)
+        return httpx.Response(200, headers={"Content-Type": content_type}, content=content, request=request)
+
+    def article_links(self, host: str):
+        for n in range(self.articles):
+            slug = f"{host.split('.')[0]}-{n}"
+            yield n, f"http://{host}/article/{slug}", f"Benchmark story {slug}"
+
+    def published(self, n: int) -> datetime:
+        return self.now - timedelta(minutes=n)
+
+    def render_rss(self, host: str) -> str:
+        item = self.templates["rss_item.xml"]
+        items = "".join(
+            item.substitute(title=title, link=link, pub_date=format_datetime(self.published(n)))
+            for n, link, title in self.article_links(host)
+        )
+        return self.templates["rss.xml"].substitute(site_name=host, base_url=f"http://{host}/", items=items)
+
+    def render_sitemap(self, host: str) -> str:
+        item = self.templates["sitemap_item.xml"]
+        items = "".join(
+            item.substitute(link=link, title=title, site_name=host, lastmod=self.published(n).isoformat())
+            for n, link, title in self.article_links(host)
+        )
+        return self.templates["sitemap.xml"].substitute(items=items)
+
+    def render_listing(self, host: str) -> str:
+        items = "\n".join(
+            f'      <a href="/article/{link.rsplit("/", 1)[-1]}">{title}</a>'
+            for n, link, title in self.article_links(host)
+        )
+        return self.templates["listing.html"].substitute(site_name=host, items=items)
+
+    def render_article(self, host: str, slug: str) -> str:
+        n = int(slug.rsplit("-", 1)[-1]) if slug.rsplit("-", 1)[-1].isdigit() else 0
+        # Words shuffled per article so bodies don't look like near-duplicates
+        rng = random.Random(slug)
+        paragraphs = []
+        for i in range(self.paragraphs):
+            words = PARAGRAPHS[i % len(PARAGRAPHS)].split()
+            rng.shuffle(words)
+            paragraphs.append(f"        <p>{' '.join(words)}</p>")
+        body = "\n".join(paragraphs)
+        return self.templates["article.html"].substitute(
+            title=f"Benchmark story {slug}",
+            site_name=host,
+            link=f"http://{host}/article/{slug}",
+            published=self.published(n).isoformat(),
+            body=body,
+        )
@@ -0,0 +1,134 @@
+from collections import Counter, deque
+import json
+import logging
+
+from feed.scraper.utils import module_available
+
+logger = logging.getLogger(__name__)
+
+
+class AhoCorasick:
+    """Pure Python Aho-Corasick automaton.
+
+    Same ``add_word`` / ``make_automaton`` / ``iter`` interface as
+    pyahocorasick's Automaton, which is used instead when installed.
+    ``iter`` yields ``(end_index, value)`` for every occurrence of every
+    pattern in one pass over the text.
+    """
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+    def add_word(self, word: str, value):
+        node = 0
+        for char in word:
+            next_node = self.goto[node].get(char)
+            if next_node is None:
+                next_node = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.goto[node][char] = next_node
+            node = next_node
+        self.output[node].append(value)
+
+    def make_automaton(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                state = self.fail[node]
+                while state and char not in self.goto[state]:
+                    state = self.fail[state]
+                self.fail[child] = self.goto[state].get(char, 0)
+                # Patterns ending at the fallback state also end here
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def iter(self, text: str):
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            for value in self.output[node]:
+                yield index, value
+
+
+def new_automaton():
+    # The C automaton needs the optional pyahocorasick package
+    if module_available("ahocorasick"):
+        import ahocorasick
+        return ahocorasick.Automaton()
+    return AhoCorasick()
+
+
+def _is_boundary(text: str, start: int, end: int) -> bool:
+    before = text[start - 1] if start > 0 else " "
+    after = text[end + 1] if end + 1 < len(text) else " "
+    return not before.isalnum() and not after.isalnum()
+
+
+class EntityMatcher:
+    """Finds the instruments an article mentions.
+
+    Company names and aliases match case-insensitively. Symbols match as
+    cashtags (``$AAPL``) and, when ``bare_symbol`` allows it, as uppercase
+    words (``AAPL``). Symbols shorter than three letters default to
+    cashtags only, since bare they collide with ordinary words. Every match
+    must sit on word boundaries.
+    """
+
+    def __init__(self, entities: list):
+        self.names = new_automaton()
+        self.symbols = new_automaton()
+        self.size = 0
+
+        for entity in entities:
+            symbol = entity["symbol"].upper()
+            names = {name.lower() for name in (entity.get("name"), *entity.get("aliases", ())) if name}
+            for name in names:
+                self.names.add_word(name, (len(name), symbol))
+            # A bare symbol also matches its cashtag, '$' being a boundary
+            if entity.get("bare_symbol", len(symbol) >= 3):
+                self.symbols.add_word(symbol, (len(symbol), symbol))
+            else:
+                self.symbols.add_word(f"${symbol}", (len(symbol) + 1, symbol))
+            self.size += 1
+
+        if self.size:
+            self.names.make_automaton()
+            self.symbols.make_automaton()
+
+    @classmethod
+    def from_file(cls, path) -> "EntityMatcher":
+        with open(path, encoding="utf-8") as f:
+            entities = json.load(f)
+        matcher = cls(entities)
+        logger.info(f"Loaded {matcher.size} entities from {path}")
+        return matcher
+
+    def __bool__(self):
+        return self.size > 0
+
+    def match(self, *texts: str) -> Counter:
+        """Mentions per symbol across all given texts"""
+        mentions = Counter()
+        if not self.size:
+            return mentions
+
+        for text in texts:
+            if not text:
+                continue
+            # A name and a longer alias starting at the same place are one mention
+            starts = set()
+            lowered = text.lower()
+            for automaton, haystack in ((self.names, lowered), (self.symbols, text)):
+                for end, (length, symbol) in automaton.iter(haystack):
+                    start = end - length + 1
+                    if _is_boundary(haystack, start, end):
+                        starts.add((symbol, start))
+            mentions.update(symbol for symbol, _ in starts)
+        return mentions
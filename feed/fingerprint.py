@@ -0,0 +1,65 @@
+from hashlib import blake2b
+import random
+import re
+
+# 64 MinHash values split into 16 bands of 4 rows. Two articles share a band
+# bucket with probability 1 - (1 - J^4)^16 for shingle Jaccard similarity J:
+# ~99% at J=0.7, ~64% at J=0.5 and ~12% at J=0.3. Candidates from the band
+# index are then checked against SIMILARITY_THRESHOLD on the full signature.
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SIMILARITY_THRESHOLD = 0.7
+
+SHINGLE_SIZE = 3
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+# Fixed seed: signatures are stored, so the permutations must never change
+_rng = random.Random(1234567)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+
+def _hash(shingle: str) -> int:
+    return int.from_bytes(blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def shingles(text: str) -> set:
+    words = _WORD.findall((text or "").lower())
+    if len(words) < SHINGLE_SIZE:
+        return set(words)
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text: str) -> list[int] | None:
+    """MinHash signature of the text's word shingles, None for empty text"""
+    hashes = [_hash(shingle) for shingle in shingles(text)]
+    if not hashes:
+        return None
+    return [min((a * h + b) % _PRIME for h in hashes) & _MAX_HASH for a, b in _PERMUTATIONS]
+
+
+def similarity(a: list[int], b: list[int]) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def band_keys(signature: list[int]) -> list[int]:
+    """One signed 64 bit bucket key per band, the band number is part of the key"""
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS]
+        data = band.to_bytes(1, "big") + b"".join(value.to_bytes(4, "big") for value in rows)
+        keys.append(int.from_bytes(blake2b(data, digest_size=8).digest(), "big", signed=True))
+    return keys
+
+
+def to_bytes(signature: list[int]) -> bytes:
+    return b"".join(value.to_bytes(4, "big") for value in signature)
+
+
+def from_bytes(data: bytes) -> list[int]:
+    data = bytes(data)
+    return [int.from_bytes(data[i:i + 4], "big") for i in range(0, len(data), 4)]
@@ -0,0 +1,111 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+from io import StringIO
+from pathlib import Path
+import json
+import resource
+import tempfile
+import time
+
+from feed.bench.server import FixtureTransport
+from feed.metrics import metrics
+from feed.models import NewsArticleModel
+
+SITE_TYPES = ("rss", "sitemap", "normal")
+# Saved articles bump the dashboard cache version, keep that away from the project's cache
+BENCH_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+def bench_sites(count: int) -> list:
+    """Synthetic sites.json cycling through every site type, one host each"""
+    sites = []
+    for i in range(count):
+        site_type = SITE_TYPES[i % len(SITE_TYPES)]
+        host = f"bench{i}.test"
+        site = {"name": f"bench_{site_type}_{i}", "type": site_type, "base_url": f"http://{host}"}
+        if site_type == "rss":
+            site["rss_feeds"] = [f"http://{host}/rss.xml"]
+        elif site_type == "sitemap":
+            site["sitemap"] = f"http://{host}/sitemap.xml"
+        else:
+            site["url"] = f"http://{host}/listing"
+            site["selectors"] = {"container": "div.listing", "articles": "div.listing a"}
+        sites.append(site)
+    return sites
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux, children covers the extraction pool
+    self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round((self_rss + children_rss) / 1024, 1)
+
+
+class Command(BaseCommand):
+    help = "Run run_scraper end to end against local fixtures and report throughput"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sites", type=int, default=6)
+        parser.add_argument("--articles", type=int, default=50, help="Articles per feed")
+        parser.add_argument("--latency", type=float, default=0.02, help="Simulated seconds per response")
+        parser.add_argument("--extract-workers", type=int, default=0)
+        parser.add_argument("--bulk-save", action="store_true")
+        parser.add_argument("--output", type=str, help="Write the report as JSON to this path")
+
+    def handle(self, *args, **options):
+        # Always run against a throwaway database and cache
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(CACHES=BENCH_CACHES):
+                report = self._run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self.stdout.write(json.dumps(report, indent=2))
+        if options.get("output"):
+            Path(options["output"]).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    def _run(self, options: dict) -> dict:
+        transport = FixtureTransport(articles=options["articles"], latency=options["latency"])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            sites_file = Path(tmp) / "sites.json"
+            sites_file.write_text(json.dumps(bench_sites(options["sites"])), encoding="utf-8")
+
+            start = time.perf_counter()
+            call_command(
+                "run_scraper",
+                sites_file=str(sites_file),
+                feeds_per_site=1,
+                articles_per_feed=options["articles"],
+                extract_workers=options["extract_workers"],
+                bulk_save=options["bulk_save"],
+                host_rate=10_000.0,
+                transport=transport,
+                stdout=StringIO(),
+            )
+            elapsed = time.perf_counter() - start
+
+        saved = NewsArticleModel.objects.count()
+        stages = metrics.stage_summary()
+        return {
+            "sites": options["sites"],
+            "articles_saved": saved,
+            "seconds": round(elapsed, 3),
+            "articles_per_sec": round(saved / elapsed, 2) if elapsed else None,
+            "requests": transport.requests,
+            "bytes_served": transport.bytes_served,
+            "peak_rss_mb": peak_rss_mb(),
+            "db_write_seconds": round(stages.get("db_save", {}).get("total", 0.0), 3),
+            "stages": {
+                stage: {
+                    "count": values["count"],
+                    "p50_ms": round(values["p50"] * 1000, 2),
+                    "p95_ms": round(values["p95"] * 1000, 2),
+                }
+                for stage, values in sorted(stages.items())
+            },
+        }
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from feed.fingerprint import minhash, to_bytes
+from feed.models import NewsArticleModel
+from feed.services.dedup import _store_fingerprints
+
+
+class Command(BaseCommand):
+    help = "Fingerprint stored articles that predate near-duplicate detection so new articles are compared with them"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        articles = (
+            NewsArticleModel.objects.filter(fingerprint__isnull=True)
+            .only("id", "title", "full_content")
+            .order_by("id")
+        )
+
+        batch, count = [], 0
+        for article in articles.iterator(chunk_size=options["batch_size"]):
+            signature = minhash(article.full_content or article.title)
+            if signature is None:
+                continue
+            article.fingerprint = to_bytes(signature)
+            batch.append(article)
+            if len(batch) >= options["batch_size"]:
+                count += self._flush(batch)
+                batch = []
+        count += self._flush(batch)
+
+        self.stdout.write(f"Fingerprinted {count} articles")
+
+    def _flush(self, batch: list) -> int:
+        if not batch:
+            return 0
+        NewsArticleModel.objects.bulk_update(batch, ["fingerprint"])
+        _store_fingerprints(batch, [], replace=True)
+        return len(batch)
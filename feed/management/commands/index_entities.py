@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from feed.entities import EntityMatcher
+from feed.models import NewsArticleModel
+from feed.services.entity_index import _index_entities
+
+
+class Command(BaseCommand):
+    help = "Rebuild ticker/company tags for stored articles, after a dictionary change or for old articles"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--entities-file", type=str, default="feed/conf/entities.json")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        matcher = EntityMatcher.from_file(options["entities_file"])
+        articles = NewsArticleModel.objects.only("id", "title", "full_content", "published").order_by("id")
+
+        batch, indexed, tags = [], 0, 0
+        for article in articles.iterator(chunk_size=options["batch_size"]):
+            batch.append(article)
+            if len(batch) >= options["batch_size"]:
+                tags += _index_entities(batch, matcher, replace=True)
+                indexed += len(batch)
+                batch = []
+        if batch:
+            tags += _index_entities(batch, matcher, replace=True)
+            indexed += len(batch)
+
+        self.stdout.write(f"Tagged {indexed} articles with {tags} symbol tags")
@@ -1,10 +1,11 @@
 from django.core.management.base import BaseCommand
+from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 from datetime import datetime
 import json
 import asyncio
-import aiohttp
 import logging
+import time
 
 from feed.scraper.api_scraper import BackendApiScraper
 from feed.models import NewsArticleModel
@@ -12,23 +13,92 @@ from feed.scraper.utils import build_api_params, load_config
 from feed.scraper.rss_scraper import RssScraper
 from feed.scraper.article_scraper import ArticleScraper
 from feed.scraper.sitemap_scraper import SitemapScraper
+from feed.scraper.http_client import ScraperHttpClient
+from feed.scraper.urls import canonicalize_url
+from feed.scraper.host_limiter import HostLimiter
+from feed.scraper.retry import RetryPolicy, CircuitBreaker
+from feed.scraper.extraction import configure_extract_pool, shutdown_extract_pool
+from feed.scraper.archive import PageArchive, ArchiveTransport
+from feed.metrics import metrics
 from feed.parsers.reuters import reuters_parser
 from feed.services.article_pipeline import process_articles
 from feed.parsers import PARSER_REGISTRY
-from feed.services.saving_to_db import save_articles
+from feed.services.saving_to_db import save_articles, save_articles_bulk
+from feed.services.link_index import KnownLinkIndex
+from feed.services.ingest_pipeline import ArticleWriter
+from feed.services.feed_state import FeedStateStore
+from feed.services.scheduler import FeedJob, FeedScheduler
+from feed.services.run_history import record_run
+from feed.services.extractor_stats import load_router, save_router
+from feed.services.entity_index import index_entities
+from feed.services.dedup import split_duplicates, store_fingerprints
+from feed.entities import EntityMatcher
 
 
 class Command(BaseCommand):
     help = "Scrape RSS feeds, extract articles, and save them to the database"
+    # Passed programmatically by bench_scraper to serve fixtures instead of the network
+    stealth_options = ("transport",)
 
     def add_arguments(self, parser):
         parser.add_argument("--feeds-per-site", type=int, default=1)
         parser.add_argument("--articles-per-feed", type=int, default=1)
         parser.add_argument("--sites-file", type=str, default="feed/conf/sites.json")
         parser.add_argument("--max-concurrent", type=int, default=10)
+        parser.add_argument("--max-connections", type=int, default=100,
+                            help="Connection pool size of the shared HTTP client")
+        parser.add_argument("--http2", action="store_true", help="Negotiate HTTP/2 where hosts support it")
+        parser.add_argument("--max-page-size", type=int, default=5_000_000,
+                            help="Article pages with a larger body in bytes are abandoned while downloading")
+        parser.add_argument("--host-rate", type=float, default=5.0,
+                            help="Requests per second allowed per host")
+        parser.add_argument("--host-max-concurrency", type=int, default=16,
+                            help="Upper bound of the adaptive per-host concurrency window")
+        parser.add_argument("--retries", type=int, default=3,
+                            help="Attempts per request for transport errors and retryable statuses")
+        parser.add_argument("--breaker-threshold", type=int, default=5,
+                            help="Consecutive failures before a host's circuit opens")
+        parser.add_argument("--breaker-cooldown", type=float, default=60.0,
+                            help="Seconds an open circuit short-circuits requests to its host")
+        parser.add_argument("--extract-workers", type=int, default=0,
+                            help="Processes for trafilatura/newspaper extraction, 0 uses threads")
+        parser.add_argument("--bulk-save", action="store_true",
+                            help="Insert articles with one bulk_create per batch instead of per-row get_or_create")
+        parser.add_argument("--save-batch-size", type=int, default=500)
+        parser.add_argument("--flush-size", type=int, default=50,
+                            help="Articles the writer collects before saving")
+        parser.add_argument("--flush-interval", type=float, default=2.0,
+                            help="Seconds the writer waits before saving a partial batch")
+        parser.add_argument("--queue-size", type=int, default=200,
+                            help="Extracted articles buffered before fetchers are slowed down")
+        parser.add_argument("--daemon", action="store_true",
+                            help="Keep running and poll every feed of every site on its own adaptive interval")
+        parser.add_argument("--min-interval", type=float, default=60.0,
+                            help="Shortest polling interval in seconds (daemon mode)")
+        parser.add_argument("--max-interval", type=float, default=3600.0,
+                            help="Longest polling interval in seconds (daemon mode)")
+        parser.add_argument("--default-interval", type=float, default=300.0,
+                            help="Starting interval for feeds without history (daemon mode)")
+        parser.add_argument("--metrics-interval", type=float, default=3600.0,
+                            help="Seconds between metrics exports and run history records (daemon mode), "
+                                 "each one starts a fresh metrics window")
+        parser.add_argument("--entities-file", type=str, default="feed/conf/entities.json",
+                            help="Ticker/company dictionary used to tag saved articles")
+        parser.add_argument("--archive-dir", type=str,
+                            help="Keep a compressed copy of every fetched article page in this directory")
+        parser.add_argument("--replay", action="store_true",
+                            help="Re-extract every archived page of --archive-dir without touching the network, "
+                                 "updating stored articles")
+        parser.add_argument("--report-json", type=str, help="Write the run's metrics report as JSON to this path")
+        parser.add_argument("--prometheus-file", type=str,
+                            help="Write the run's metrics in Prometheus text format to this path")
 
     def handle(self, *args, **options):
-        asyncio.run(self._handle_async(**options))
+        configure_extract_pool(options["extract_workers"])
+        try:
+            asyncio.run(self._handle_async(**options))
+        finally:
+            shutdown_extract_pool()
 
     async def _handle_async(self, **options):
 
@@ -38,24 +108,108 @@ class Command(BaseCommand):
             self.stderr.write(f"Sites file not found: {options['sites_file']}")
             return
         
+        if options["replay"] and not options.get("archive_dir"):
+            self.stderr.write("--replay needs --archive-dir")
+            return
+
+        self.options = options
+        self.site_outcomes = {}
+        started_at = timezone.now()
+        self.window_started_at = started_at
+        metrics.reset()
+        self.known_links = await KnownLinkIndex.load()
+        self.router = await load_router()
+        self.entity_matcher = self._load_entity_matcher(options.get("entities_file"))
+        feed_state = await FeedStateStore.load()
         semaphore = asyncio.Semaphore(options["max_concurrent"])
 
+        archive = PageArchive(options["archive_dir"]) if options.get("archive_dir") else None
+        transport = options.get("transport")
+        limiter = HostLimiter(rate=options["host_rate"], max_concurrency=options["host_max_concurrency"])
+        if options["replay"]:
+            self.stdout.write(f"Replaying {len(archive)} archived pages from {options['archive_dir']}")
+            # Pages come from disk, politeness limits only slow us down
+            transport = ArchiveTransport(archive)
+            limiter = HostLimiter(rate=1_000_000.0, burst=1_000_000,
+                                  initial_concurrency=options["host_max_concurrency"],
+                                  max_concurrency=options["host_max_concurrency"])
+        # Pages are archived as they are fetched, never while replaying
+        self.archive = None if options["replay"] else archive
+        self.replay_archive = archive if options["replay"] else None
+
         async def process_site_with_limit(site):
             async with semaphore:
-                return await self._process_site(site, options)
-            
-        tasks = [process_site_with_limit(site) for site in sites]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+                start = time.perf_counter()
+                with metrics.timer("site"):
+                    result = await self._process_site(site, options)
+                self.site_outcomes[site.get("name", "<unknown>")] = {
+                    "duration": time.perf_counter() - start,
+                    "succeeded": result is not None,
+                }
+                return result
+
+        # One client for the whole run so connections are reused across sites and articles
+        async with ScraperHttpClient(
+            max_connections=options["max_connections"],
+            http2=options["http2"],
+            feed_state=feed_state,
+            limiter=limiter,
+            retry=RetryPolicy(attempts=options["retries"]),
+            breaker=CircuitBreaker(options["breaker_threshold"], options["breaker_cooldown"]),
+            transport=transport,
+            max_page_bytes=options["max_page_size"],
+        ) as client, ArticleWriter(
+            self._save_articles,
+            batch_size=options["flush_size"],
+            flush_interval=options["flush_interval"],
+            max_queue=options["queue_size"],
+        ) as writer:
+            self.client = client
+            self.writer = writer
+
+            if options["daemon"] and not options["replay"]:
+                await self._run_daemon(sites, feed_state, options)
+                return
+
+            tasks = [process_site_with_limit(site) for site in sites]
+            with metrics.timer("run"):
+                results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        await feed_state.save()
+        await save_router(self.router)
+        try:
+            await record_run(metrics, started_at, timezone.now(), self.site_outcomes)
+        except Exception as e:
+            self.stderr.write(f"Failed to record run history: {e}")
 
         successful = sum(1 for r in results if not isinstance(r, Exception))
         self.stdout.write(f"Processed {successful}/{len(sites)} sites successfully")
+        self.stdout.write(
+            f"Network fetches: {metrics.get('network_fetches')} "
+            f"(article pages: {metrics.get('article_pages_fetched')}), "
+            f"extractions: {metrics.get('extractions')}, "
+            f"duplicate fetches skipped: {metrics.get('duplicate_fetches_skipped')}, "
+            f"unchanged feeds: {metrics.get('not_modified')}, "
+            f"retries: {metrics.get('retries')}, "
+            f"short-circuited requests: {metrics.get('circuit_short_circuits')}"
+        )
+        self._export_metrics(options)
+
+    def _export_metrics(self, options: dict):
+        if options.get("report_json"):
+            metrics.write_json(options["report_json"])
+            self.stdout.write(f"Run report written to {options['report_json']}")
+        if options.get("prometheus_file"):
+            metrics.write_prometheus(options["prometheus_file"])
 
     async def _process_site(self, site:dict, options: dict):
         site_name = site.get("name", "<unknown>")
         self.stdout.write(f"Processing site: {site_name}")
 
         try: 
-            if site.get("type") == "rss":
+            if options["replay"]:
+                return await self._replay_site(site)
+            elif site.get("type") == "rss":
                 return await self._run_rss_optimized(site, options)
             elif site.get("type") == "normal":
                 return await self._run_api_optimized(site, options)
@@ -66,48 +220,189 @@ class Command(BaseCommand):
                 return None
         except Exception as e:
             self.stderr.write(f"Error processing {site_name}: {e}")
+            metrics.record_error(e, site_name)
             return None
         
 
+    # Daemon mode
+
+
+    async def _run_daemon(self, sites: list, feed_state: FeedStateStore, options: dict):
+        jobs = [job for site in sites for job in self._build_jobs(site)]
+        self.stdout.write(f"Scheduling {len(jobs)} feeds from {len(sites)} sites")
+
+        scheduler = FeedScheduler(
+            jobs,
+            feed_state=feed_state,
+            min_interval=options["min_interval"],
+            max_interval=options["max_interval"],
+            default_interval=options["default_interval"],
+            max_concurrent=options["max_concurrent"],
+            on_flush=self._roll_over_if_due,
+        )
+        try:
+            await scheduler.run_forever()
+        finally:
+            await feed_state.save()
+            await self._roll_over()
+
+    async def _roll_over_if_due(self):
+        elapsed = (timezone.now() - self.window_started_at).total_seconds()
+        if elapsed >= self.options["metrics_interval"]:
+            await self._roll_over()
+
+    async def _roll_over(self):
+        """Close the current metrics window of a daemon run.
+
+        The window is exported and recorded as a run, then metrics, site
+        outcomes and URL claims start over, so none of them grows with the
+        daemon's uptime. Claimed URLs that were saved stay skipped through
+        the known-links index.
+        """
+        finished_at = timezone.now()
+        await save_router(self.router)
+        self._export_metrics(self.options)
+        try:
+            await record_run(metrics, self.window_started_at, finished_at, self.site_outcomes)
+        except Exception as e:
+            self.stderr.write(f"Failed to record run history: {e}")
+
+        self.stdout.write(f"Metrics window closed: {metrics.summary()}")
+        metrics.reset()
+        self.site_outcomes = {}
+        self.client.clear_claims()
+        self.window_started_at = finished_at
+
+    def _record_poll(self, site: dict, duration: float, succeeded: bool):
+        """Fold one daemon poll into the site's outcome for the current window"""
+        name = site.get("name", "<unknown>")
+        outcome = self.site_outcomes.setdefault(name, {"duration": 0.0, "succeeded": True})
+        outcome["duration"] += duration
+        outcome["succeeded"] = outcome["succeeded"] and succeeded
+
+    def _build_jobs(self, site: dict) -> list[FeedJob]:
+        """Every feed of a site, without the --feeds-per-site cap.
+
+        Job URLs are canonical, the same key the scrapers keep the feed's
+        validators under, so interval and validators share one FeedState.
+
+        Each poll takes all new entries, the known-links index keeps it
+        from re-scraping what is already stored.
+        """
+        async def count(coro):
+            start = time.perf_counter()
+            succeeded = False
+            try:
+                result = await coro
+                succeeded = True
+                return len(result or [])
+            finally:
+                self._record_poll(site, time.perf_counter() - start, succeeded)
+
+        site_type = site.get("type")
+        if site_type == "rss":
+            return [
+                FeedJob(site, canonicalize_url(url), lambda url=url: count(self._poll_rss_feed(site, url, None)))
+                for url in site.get("rss_feeds", [])
+            ]
+        if site_type == "sitemap":
+            return [
+                FeedJob(site, canonicalize_url(url), lambda url=url: count(self._poll_sitemap(site, url, None)))
+                for url in self._sitemap_urls(site)
+            ]
+        if site_type == "normal":
+            categories = site.get("categories") or [None]
+            return [
+                FeedJob(
+                    site,
+                    BackendApiScraper(site["url"], site["name"], site["selectors"], site["base_url"], category).final_url,
+                    lambda category=category: count(self._process_api_category(site, category, None)),
+                )
+                for category in categories
+            ]
+
+        self.stderr.write(f"Unknown site type: {site_type}")
+        return []
+
+    async def _save_articles(self, articles: list):
+        replay = self.options["replay"]
+        # Near-duplicates of stored stories are recorded as pointers, not saved
+        articles, duplicates = await split_duplicates(articles)
+        for duplicate in duplicates:
+            self.known_links.add(duplicate["article"]["link"])
+
+        if replay:
+            results = await save_articles_bulk(articles, batch_size=self.options["save_batch_size"], overwrite=True)
+        elif self.options["bulk_save"]:
+            results = await save_articles_bulk(articles, batch_size=self.options["save_batch_size"])
+        else:
+            results = await save_articles(articles)
+        for saved in results["saved"]:
+            self.known_links.add(saved["object"].link)
+
+        # Replayed articles were re-extracted, their fingerprints and tags are rebuilt too
+        new = [saved["object"] for saved in results["saved"] if saved["created"] or replay]
+        try:
+            await store_fingerprints(new, duplicates, replace=replay)
+        except Exception as e:
+            self.stderr.write(f"Failed to store fingerprints: {e}")
+        if self.entity_matcher and new:
+            try:
+                await index_entities(new, self.entity_matcher, replace=replay)
+            except Exception as e:
+                self.stderr.write(f"Failed to index entities: {e}")
+        return results
+
+    def _load_entity_matcher(self, path: str):
+        if not path:
+            return None
+        try:
+            return EntityMatcher.from_file(path)
+        except FileNotFoundError:
+            self.stderr.write(f"Entities file not found: {path}, articles won't be tagged")
+            return None
+
+    # Replay
+
+
+    async def _replay_site(self, site: dict):
+        """Extract the site's archived pages again, the client only sees the archive"""
+        links = self.replay_archive.urls_for(site.get("name"))
+        if not links:
+            return []
+        return await process_articles(links, site, from_dicts=False, client=self.client,
+                                      writer=self.writer, router=self.router)
+
     # RSS scraper
 
     
     async def _run_rss_optimized(self, site: dict, options: dict):
         feeds_urls = site.get("rss_feeds", [])[:options["feeds_per_site"]]
 
-        async with aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=30),
-            connector=aiohttp.TCPConnector(limit=50)
-        ) as session:
-            rss_tasks = []
-            for feed_url in feeds_urls:
-                scraper = RssScraper(feed_url, site["name"])
-                rss_tasks.append(scraper.fetch_articles(session, limit=options["articles_per_feed"]))
+        rss_tasks = []
+        for feed_url in feeds_urls:
+            scraper = RssScraper(feed_url, site["name"])
+            rss_tasks.append(scraper.fetch_articles(self.client, limit=options["articles_per_feed"]))
 
-            feed_results = await asyncio.gather(*rss_tasks, return_exceptions=True)
-
-            all_entries = []
-            for entries in feed_results:
-                if not isinstance(entries, Exception) and entries:
-                    all_entries.extend(entries)
-
-            if not all_entries:
-                return []
-            
-            batch_size = 20
-            all_articles = []
+        feed_results = await asyncio.gather(*rss_tasks, return_exceptions=True)
 
-            for i in range(0, len(all_entries), batch_size):
-                batch = all_entries[i:i + batch_size]
-                batch_articles = await process_articles
+        all_entries = []
+        for entries in feed_results:
+            if not isinstance(entries, Exception) and entries:
+                all_entries.extend(entries)
 
-                if batch_articles:
-                    await save_articles(batch_articles)
-                    all_articles.extend(batch_articles)
+        if not all_entries:
+            return []
 
-                await asyncio.sleep(0.5)
+        return await process_articles(all_entries, site, client=self.client,
+                                      known_links=self.known_links, writer=self.writer, router=self.router,
+                                      archive=self.archive)
 
-            return all_articles
+    async def _poll_rss_feed(self, site: dict, feed_url: str, limit: int):
+        entries = await RssScraper(feed_url, site["name"]).fetch_articles(self.client, limit=limit)
+        return await process_articles(entries, site, client=self.client,
+                                      known_links=self.known_links, writer=self.writer, router=self.router,
+                                      archive=self.archive)
         
 
 
@@ -147,16 +442,16 @@ class Command(BaseCommand):
                 url=site["url"],
                 source=site["name"],
                 category=category,
-                selectors=site["selectors"]
+                selectors=site["selectors"],
+                client=self.client
                 )
 
-            links = await scraper.fetch_article_async(limit=limit)
+            links = await scraper.fetch_article_links_async(limit=limit)
 
             if links:
-                articles = await process_articles(links, site, from_dict=False)
-                if articles:
-                    await save_articles(articles)
-                return articles
+                return await process_articles(links, site, from_dicts=False, client=self.client,
+                                              known_links=self.known_links, writer=self.writer, router=self.router,
+                                              archive=self.archive)
             
         except Exception as e:
             self.stderr.write(f"Error processing API category {category}: {e}")
@@ -167,25 +462,32 @@ class Command(BaseCommand):
     # Sitemap scraper
 
 
+    def _sitemap_urls(self, site: dict) -> list:
+        return site.get("sitemaps") or ([site["sitemap"]] if site.get("sitemap") else [])
+
     async def _run_sitemap_optimized(self, site: dict, options: dict):
-        sitemap_urls = site.get("sitemaps", [])[:options["feeds_per_site"]]
+        sitemap_urls = self._sitemap_urls(site)[:options["feeds_per_site"]]
         all_articles = []
 
         for sitemap_url in sitemap_urls:
-            try:
-                scraper = SitemapScraper(sitemap_url)
-                links = await scraper.fetch_articles(limit=options["articles_per_feed"])
+            all_articles.extend(await self._poll_sitemap(site, sitemap_url, options["articles_per_feed"]))
 
-                if links:
-                    articles = await process_articles(links, site, from_dicts=False)
-                    if articles:
-                        await save_articles(articles)
-                        all_articles.extend(articles)
+        return all_articles
 
-            except Exception as e:
-                self.stderr.write(f"Error processing sitemap {sitemap_url}: {e}")
+    async def _poll_sitemap(self, site: dict, sitemap_url: str, limit: int):
+        try:
+            scraper = SitemapScraper(sitemap_url, client=self.client, known_links=self.known_links)
+            links = await scraper.fetch_articles_async(limit=limit)
 
-        return all_articles
+            if links:
+                return await process_articles(links, site, client=self.client,
+                                              known_links=self.known_links, writer=self.writer, router=self.router,
+                                              archive=self.archive)
+
+        except Exception as e:
+            self.stderr.write(f"Error processing sitemap {sitemap_url}: {e}")
+
+        return []
 
 
     
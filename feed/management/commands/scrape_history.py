@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from datetime import timedelta
+
+from feed.models import ScrapeRun, ScrapeItem
+
+
+class Command(BaseCommand):
+    help = "Show scrape throughput per day and the slowest sources from recorded runs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=14)
+        parser.add_argument("--sources", type=int, default=10, help="How many of the slowest sources to list")
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options["days"])
+        runs = ScrapeRun.objects.filter(started_at__gte=since)
+
+        daily = (
+            runs.annotate(day=TruncDate("started_at"))
+            .values("day")
+            .annotate(
+                runs=Count("id"),
+                avg_duration=Avg("duration"),
+                total_duration=Sum("duration"),
+                extracted=Sum("articles_extracted"),
+                created=Sum("articles_created"),
+                failed=Sum("articles_failed"),
+                megabytes=Sum("bytes_downloaded"),
+            )
+            .order_by("day")
+        )
+
+        self.stdout.write(f"{'day':<12}{'runs':>6}{'avg s':>9}{'extracted':>11}{'created':>9}{'failed':>8}{'art/s':>8}{'MB':>9}")
+        for row in daily:
+            rate = row["extracted"] / row["total_duration"] if row["total_duration"] else 0
+            self.stdout.write(
+                f"{row['day']!s:<12}{row['runs']:>6}{row['avg_duration']:>9.1f}{row['extracted']:>11}"
+                f"{row['created']:>9}{row['failed']:>8}{rate:>8.2f}{row['megabytes'] / 1_000_000:>9.1f}"
+            )
+
+        slowest = (
+            ScrapeItem.objects.filter(run__started_at__gte=since)
+            .values("source")
+            .annotate(
+                runs=Count("id"),
+                avg_duration=Avg("duration"),
+                extracted=Sum("extracted"),
+                failed=Sum("failed"),
+            )
+            .order_by("-avg_duration")[:options["sources"]]
+        )
+
+        self.stdout.write("")
+        self.stdout.write(f"{'source':<28}{'runs':>6}{'avg s':>9}{'extracted':>11}{'failed':>8}")
+        for row in slowest:
+            self.stdout.write(
+                f"{row['source']:<28}{row['runs']:>6}{row['avg_duration']:>9.1f}{row['extracted']:>11}{row['failed']:>8}"
+            )
@@ -0,0 +1,184 @@
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+import json
+import random
+import time
+
+# Upper bounds in seconds for the exported stage histograms
+HISTOGRAM_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Timings kept per stage for percentiles, count, sum and buckets stay exact
+MAX_TIMING_SAMPLES = 10_000
+
+
+def percentile(values: list, q: float):
+    """Nearest-rank percentile, q between 0 and 100"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class RunMetrics:
+    """Counters and per-stage timings collected over one scrape run.
+
+    Global counters cover the whole run, ``sources`` keeps the same kind of
+    counters per site (fetched, skipped, extracted, saved, failed) and
+    ``extractors`` counts how often each extraction stage ran and how often
+    it supplied at least one field. Per-stage percentiles come from a
+    uniform sample of at most ``max_samples`` timings, so a long daemon
+    run doesn't grow without bound.
+    """
+
+    def __init__(self, max_samples: int = MAX_TIMING_SAMPLES):
+        self.max_samples = max_samples
+        self.counters = Counter()
+        self.sources = defaultdict(Counter)
+        self.extractors = defaultdict(Counter)
+        self.errors = defaultdict(Counter)
+        self.timings = defaultdict(list)
+        self.timing_counts = Counter()
+        self.timing_totals = defaultdict(float)
+        self.timing_buckets = defaultdict(lambda: [0] * len(HISTOGRAM_BUCKETS))
+        self.started_at = datetime.now(timezone.utc)
+
+    def incr(self, name: str, amount: int = 1, source: str = None):
+        self.counters[name] += amount
+        if source is not None:
+            self.sources[source][name] += amount
+
+    def get(self, name: str) -> int:
+        return self.counters[name]
+
+    def record_error(self, error, source: str = None):
+        """Count an exception (or its class name) under the source it happened for"""
+        name = error if isinstance(error, str) else type(error).__name__
+        self.errors[source or ""][name] += 1
+
+    def error_classes(self, source: str = None) -> dict:
+        if source is not None:
+            return dict(self.errors.get(source, {}))
+        total = Counter()
+        for counts in self.errors.values():
+            total.update(counts)
+        return dict(total)
+
+    def record_extractor(self, stage: str, won: bool):
+        self.extractors[stage]["runs"] += 1
+        if won:
+            self.extractors[stage]["wins"] += 1
+
+    def observe(self, stage: str, seconds: float):
+        self.timing_counts[stage] += 1
+        self.timing_totals[stage] += seconds
+        buckets = self.timing_buckets[stage]
+        for i, bound in enumerate(HISTOGRAM_BUCKETS):
+            if seconds <= bound:
+                buckets[i] += 1
+
+        # Reservoir sampling, every timing has the same chance to be kept
+        samples = self.timings[stage]
+        if len(samples) < self.max_samples:
+            samples.append(seconds)
+        else:
+            index = random.randrange(self.timing_counts[stage])
+            if index < self.max_samples:
+                samples[index] = seconds
+
+    @contextmanager
+    def timer(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def stage_summary(self) -> dict:
+        return {
+            stage: {
+                "count": self.timing_counts[stage],
+                "total": self.timing_totals[stage],
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+            }
+            for stage, values in self.timings.items()
+        }
+
+    def reset(self):
+        self.counters.clear()
+        self.sources.clear()
+        self.extractors.clear()
+        self.errors.clear()
+        self.timings.clear()
+        self.timing_counts.clear()
+        self.timing_totals.clear()
+        self.timing_buckets.clear()
+        self.started_at = datetime.now(timezone.utc)
+
+    def summary(self) -> str:
+        return ", ".join(f"{name}={count}" for name, count in sorted(self.counters.items()))
+
+    # Exports
+
+    def to_report(self) -> dict:
+        return {
+            "started_at": self.started_at.isoformat(),
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "counters": dict(self.counters),
+            "sources": {source: dict(counts) for source, counts in self.sources.items()},
+            "extractors": {
+                stage: {
+                    "runs": counts["runs"],
+                    "wins": counts["wins"],
+                    "win_rate": round(counts["wins"] / counts["runs"], 3) if counts["runs"] else None,
+                }
+                for stage, counts in self.extractors.items()
+            },
+            "errors": {source or "global": dict(counts) for source, counts in self.errors.items()},
+            "stages": self.stage_summary(),
+        }
+
+    def write_json(self, path):
+        Path(path).write_text(json.dumps(self.to_report(), indent=2), encoding="utf-8")
+
+    def to_prometheus(self) -> str:
+        lines = ["# TYPE scraper_events_total counter"]
+        for name, count in sorted(self.counters.items()):
+            lines.append(f'scraper_events_total{{event="{_label(name)}"}} {count}')
+
+        lines.append("# TYPE scraper_source_events_total counter")
+        for source, counts in sorted(self.sources.items()):
+            for name, count in sorted(counts.items()):
+                lines.append(
+                    f'scraper_source_events_total{{source="{_label(source)}",event="{_label(name)}"}} {count}'
+                )
+
+        for kind in ("runs", "wins"):
+            lines.append(f"# TYPE scraper_extractor_{kind}_total counter")
+            for stage, counts in sorted(self.extractors.items()):
+                lines.append(f'scraper_extractor_{kind}_total{{extractor="{_label(stage)}"}} {counts[kind]}')
+
+        lines.append("# TYPE scraper_stage_seconds histogram")
+        for stage, count in sorted(self.timing_counts.items()):
+            label = _label(stage)
+            for bound, bucket in zip(HISTOGRAM_BUCKETS, self.timing_buckets[stage]):
+                lines.append(f'scraper_stage_seconds_bucket{{stage="{label}",le="{bound}"}} {bucket}')
+            lines.append(f'scraper_stage_seconds_bucket{{stage="{label}",le="+Inf"}} {count}')
+            lines.append(f'scraper_stage_seconds_sum{{stage="{label}"}} {self.timing_totals[stage]}')
+            lines.append(f'scraper_stage_seconds_count{{stage="{label}"}} {count}')
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        Path(path).write_text(self.to_prometheus(), encoding="utf-8")
+
+
+# Process-wide instance, reset by run_scraper at the start of every run and
+# whenever a daemon run closes a metrics window
+metrics = RunMetrics()
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feed', '0002_remove_newsarticlemodel_summary_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=1000, unique=True)),
+                ('etag', models.CharField(blank=True, default='', max_length=300)),
+                ('last_modified', models.CharField(blank=True, default='', max_length=100)),
+                ('checked_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feed', '0003_feedstate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedstate',
+            name='watermark',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
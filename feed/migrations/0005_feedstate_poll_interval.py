@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feed', '0004_feedstate_watermark'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedstate',
+            name='poll_interval',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feed', '0005_feedstate_poll_interval'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScrapeRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField()),
+                ('duration', models.FloatField(help_text='Seconds')),
+                ('sites_total', models.PositiveIntegerField(default=0)),
+                ('sites_succeeded', models.PositiveIntegerField(default=0)),
+                ('network_fetches', models.PositiveIntegerField(default=0)),
+                ('articles_fetched', models.PositiveIntegerField(default=0)),
+                ('articles_skipped', models.PositiveIntegerField(default=0)),
+                ('articles_extracted', models.PositiveIntegerField(default=0)),
+                ('articles_saved', models.PositiveIntegerField(default=0)),
+                ('articles_created', models.PositiveIntegerField(default=0)),
+                ('articles_failed', models.PositiveIntegerField(default=0)),
+                ('bytes_downloaded', models.BigIntegerField(default=0)),
+                ('error_classes', models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['started_at'], name='feed_scrape_started_56f652_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ScrapeItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=100)),
+                ('duration', models.FloatField(help_text='Seconds')),
+                ('succeeded', models.BooleanField(default=True)),
+                ('fetched', models.PositiveIntegerField(default=0)),
+                ('skipped', models.PositiveIntegerField(default=0)),
+                ('extracted', models.PositiveIntegerField(default=0)),
+                ('saved', models.PositiveIntegerField(default=0)),
+                ('created', models.PositiveIntegerField(default=0)),
+                ('failed', models.PositiveIntegerField(default=0)),
+                ('bytes_downloaded', models.BigIntegerField(default=0)),
+                ('error_classes', models.JSONField(blank=True, default=dict)),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='feed.scraperun')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['source'], name='feed_scrape_source_cce126_idx')],
+            },
+        ),
+    ]
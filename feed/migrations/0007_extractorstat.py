@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feed', '0006_scraperun_scrapeitem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExtractorStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=100)),
+                ('extractor', models.CharField(max_length=50)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('fields_supplied', models.PositiveIntegerField(default=0)),
+                ('complete', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('source', 'extractor'), name='unique_extractor_stat')],
+            },
+        ),
+    ]
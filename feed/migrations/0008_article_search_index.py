@@ -0,0 +1,85 @@
+# Full-text search over NewsArticleModel title and full_content
+
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    # External content table, the text itself stays in feed_newsarticlemodel
+    """
+    CREATE VIRTUAL TABLE feed_article_fts USING fts5(
+        title, full_content,
+        content='feed_newsarticlemodel', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    # Triggers keep the index in step with every write, bulk_create and
+    # upserts included, inside the same transaction
+    """
+    CREATE TRIGGER feed_article_fts_insert AFTER INSERT ON feed_newsarticlemodel BEGIN
+        INSERT INTO feed_article_fts(rowid, title, full_content)
+        VALUES (new.id, new.title, new.full_content);
+    END
+    """,
+    """
+    CREATE TRIGGER feed_article_fts_delete AFTER DELETE ON feed_newsarticlemodel BEGIN
+        INSERT INTO feed_article_fts(feed_article_fts, rowid, title, full_content)
+        VALUES ('delete', old.id, old.title, old.full_content);
+    END
+    """,
+    """
+    CREATE TRIGGER feed_article_fts_update AFTER UPDATE OF title, full_content ON feed_newsarticlemodel BEGIN
+        INSERT INTO feed_article_fts(feed_article_fts, rowid, title, full_content)
+        VALUES ('delete', old.id, old.title, old.full_content);
+        INSERT INTO feed_article_fts(rowid, title, full_content)
+        VALUES (new.id, new.title, new.full_content);
+    END
+    """,
+    "INSERT INTO feed_article_fts(feed_article_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS feed_article_fts_update",
+    "DROP TRIGGER IF EXISTS feed_article_fts_delete",
+    "DROP TRIGGER IF EXISTS feed_article_fts_insert",
+    "DROP TABLE IF EXISTS feed_article_fts",
+]
+
+# Expression index, maintained by Postgres itself and used by queries that
+# repeat the same to_tsvector expression (see feed.services.search)
+POSTGRES_FORWARD = [
+    """
+    CREATE INDEX feed_article_search_idx ON feed_newsarticlemodel USING GIN (
+        (setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+         setweight(to_tsvector('english', coalesce(full_content, '')), 'B'))
+    )
+    """,
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS feed_article_search_idx",
+]
+
+
+def run_statements(forward: bool):
+    def run(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        if vendor == "sqlite":
+            statements = SQLITE_FORWARD if forward else SQLITE_BACKWARD
+        elif vendor == "postgresql":
+            statements = POSTGRES_FORWARD if forward else POSTGRES_BACKWARD
+        else:
+            # Other backends fall back to LIKE queries
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feed', '0007_extractorstat'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_statements(True), run_statements(False)),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feed', '0008_article_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleEntity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(max_length=20)),
+                ('mentions', models.PositiveIntegerField(default=1)),
+                ('published', models.DateField()),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entities', to='feed.newsarticlemodel')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['symbol', '-published'], name='feed_articl_symbol_e45cdd_idx')],
+                'constraints': [models.UniqueConstraint(fields=('article', 'symbol'), name='unique_article_entity')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feed', '0009_articleentity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsarticlemodel',
+            name='fingerprint',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ArticleFingerprintBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField(db_index=True)),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fingerprint_bands', to='feed.newsarticlemodel')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DuplicateArticle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=100)),
+                ('title', models.CharField(max_length=300)),
+                ('link', models.URLField(unique=True)),
+                ('published', models.DateField(blank=True, null=True)),
+                ('similarity', models.FloatField()),
+                ('detected_at', models.DateTimeField(auto_now_add=True)),
+                ('canonical', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='duplicates', to='feed.newsarticlemodel')),
+            ],
+        ),
+    ]
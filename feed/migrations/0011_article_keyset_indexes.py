@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feed', '0010_fingerprints'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='newsarticlemodel',
+            name='feed_newsar_publish_f9fced_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='newsarticlemodel',
+            name='feed_newsar_source_cee4f7_idx',
+        ),
+        migrations.AddIndex(
+            model_name='newsarticlemodel',
+            index=models.Index(fields=['-published', '-id'], name='feed_newsar_publish_78f400_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsarticlemodel',
+            index=models.Index(fields=['source', '-published', '-id'], name='feed_newsar_source_81253c_idx'),
+        ),
+    ]
@@ -7,12 +7,141 @@ class NewsArticleModel(models.Model):
     link = models.URLField(unique=True)
     published = models.DateField()
     full_content = models.TextField()
+    # MinHash signature of full_content, see feed.fingerprint
+    fingerprint = models.BinaryField(null=True, blank=True)
 
     class Meta:
         indexes = [
-            models.Index(fields=["published"]),
-            models.Index(fields=["source"])
+            # Keyset pagination walks (published, id) newest first, optionally within one source
+            models.Index(fields=["-published", "-id"]),
+            models.Index(fields=["source", "-published", "-id"]),
         ]
 
     def __str__(self):
         return f"{self.title} ({self.source})"
+
+
+class FeedState(models.Model):
+    """Per-URL polling state for feeds, sitemaps and listing pages"""
+    url = models.URLField(unique=True, max_length=1000)
+    etag = models.CharField(max_length=300, blank=True, default="")
+    last_modified = models.CharField(max_length=100, blank=True, default="")
+    checked_at = models.DateTimeField(null=True, blank=True)
+    # Newest sitemap lastmod already handed out, older URLs are skipped
+    watermark = models.DateTimeField(null=True, blank=True)
+    # Learned polling interval in seconds for the scheduler daemon
+    poll_interval = models.FloatField(null=True, blank=True)
+
+    def __str__(self):
+        return self.url
+
+
+class ScrapeRun(models.Model):
+    """One run_scraper invocation"""
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+    duration = models.FloatField(help_text="Seconds")
+    sites_total = models.PositiveIntegerField(default=0)
+    sites_succeeded = models.PositiveIntegerField(default=0)
+    network_fetches = models.PositiveIntegerField(default=0)
+    articles_fetched = models.PositiveIntegerField(default=0)
+    articles_skipped = models.PositiveIntegerField(default=0)
+    articles_extracted = models.PositiveIntegerField(default=0)
+    articles_saved = models.PositiveIntegerField(default=0)
+    articles_created = models.PositiveIntegerField(default=0)
+    articles_failed = models.PositiveIntegerField(default=0)
+    bytes_downloaded = models.BigIntegerField(default=0)
+    error_classes = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["started_at"]),
+        ]
+
+    def __str__(self):
+        return f"Run {self.started_at:%Y-%m-%d %H:%M} ({self.duration:.0f}s)"
+
+
+class ScrapeItem(models.Model):
+    """Outcome of one site within a ScrapeRun"""
+    run = models.ForeignKey(ScrapeRun, on_delete=models.CASCADE, related_name="items")
+    source = models.CharField(max_length=100)
+    duration = models.FloatField(help_text="Seconds")
+    succeeded = models.BooleanField(default=True)
+    fetched = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    extracted = models.PositiveIntegerField(default=0)
+    saved = models.PositiveIntegerField(default=0)
+    created = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    bytes_downloaded = models.BigIntegerField(default=0)
+    error_classes = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["source"]),
+        ]
+
+    def __str__(self):
+        return f"{self.source} ({self.run_id})"
+
+
+class ExtractorStat(models.Model):
+    """How well one extraction stage has worked for one source"""
+    source = models.CharField(max_length=100)
+    extractor = models.CharField(max_length=50)
+    attempts = models.PositiveIntegerField(default=0)
+    fields_supplied = models.PositiveIntegerField(default=0)
+    complete = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["source", "extractor"], name="unique_extractor_stat"),
+        ]
+
+    def __str__(self):
+        return f"{self.source}: {self.extractor} ({self.complete}/{self.attempts})"
+
+
+class ArticleEntity(models.Model):
+    """Instrument an article mentions, tagged at ingestion from feed/conf/entities.json"""
+    article = models.ForeignKey(NewsArticleModel, on_delete=models.CASCADE, related_name="entities")
+    symbol = models.CharField(max_length=20)
+    mentions = models.PositiveIntegerField(default=1)
+    # Copied from the article so "news for a symbol since a date" is one index range scan
+    published = models.DateField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["article", "symbol"], name="unique_article_entity"),
+        ]
+        indexes = [
+            models.Index(fields=["symbol", "-published"]),
+        ]
+
+    def __str__(self):
+        return f"{self.symbol} in {self.article_id}"
+
+
+class ArticleFingerprintBand(models.Model):
+    """LSH bucket of an article's fingerprint, one row per band"""
+    article = models.ForeignKey(NewsArticleModel, on_delete=models.CASCADE, related_name="fingerprint_bands")
+    key = models.BigIntegerField(db_index=True)
+
+    def __str__(self):
+        return f"{self.key} ({self.article_id})"
+
+
+class DuplicateArticle(models.Model):
+    """Near-duplicate of a stored article, kept as a pointer instead of a second story"""
+    canonical = models.ForeignKey(NewsArticleModel, on_delete=models.CASCADE, related_name="duplicates")
+    source = models.CharField(max_length=100)
+    title = models.CharField(max_length=300)
+    link = models.URLField(unique=True)
+    published = models.DateField(null=True, blank=True)
+    similarity = models.FloatField()
+    detected_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.link} -> {self.canonical_id}"
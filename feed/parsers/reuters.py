@@ -1,10 +1,13 @@
+from feed.scraper.urls import canonicalize_url
+
+
 def reuters_parser(data):
     articles = []
     for item in data.get("result", {}).get("articles", []):
         articles.append({
             "title": item.get("title"),
-            "link": f"http://www.reuters.com{item.get("canonical_url")}",
+            "link": canonicalize_url(item.get("canonical_url"), base="https://www.reuters.com"),
             "summary": item.get("description"),
             "published": item.get("published_time")
         })
-    return articles
\ No newline at end of file
+    return articles
@@ -1,19 +1,21 @@
-import httpx
 from selectolax.parser import HTMLParser
 from datetime import datetime
 import asyncio
 import logging
 
+from feed.scraper.http_client import ScraperHttpClient
+from feed.scraper.urls import canonicalize_url
+
 class BackendApiScraper:
-    def __init__(self, url: str, source: str, selectors: dict, base_url: str, category: str = None):
+    def __init__(self, url: str, source: str, selectors: dict, base_url: str, category: str = None,
+                 client: ScraperHttpClient = None):
         self.url = url
         self.base_url = base_url
         self.source = source
         self.category = category
         self.selectors = selectors
-        self.headers = {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36"}
-        self.final_url = self.prepare_url(self.url)
+        self.client = client
+        self.final_url = canonicalize_url(self.prepare_url(self.url))
 
     def prepare_url(self, url_template):
         now = datetime.now()
@@ -29,14 +31,21 @@ class BackendApiScraper:
         return url_template
         
     async def fetch_data_async(self):
-        async with httpx.AsyncClient(headers=self.headers, timeout=30.0) as client:
-            try:
-                response = await client.get(self.final_url)
-                response.raise_for_status()
-                return response.text
-            except Exception as e:
-                logging.error(f"Failed to fetch {self.final_url}: {e}")
+        if self.client is None:
+            async with ScraperHttpClient() as client:
+                return await self._fetch_with(client)
+        return await self._fetch_with(self.client)
+
+    async def _fetch_with(self, client: ScraperHttpClient):
+        try:
+            response = await client.get_if_modified(self.final_url)
+            if response is None:
                 return None
+            response.raise_for_status()
+            return response.text
+        except Exception as e:
+            logging.error(f"Failed to fetch {self.final_url}: {e}")
+            return None
             
     async def fetch_article_links_async(self, limit: int = None):
         html_content = await self.fetch_data_async()
@@ -53,13 +62,15 @@ class BackendApiScraper:
             else:
                 container = tree
 
-            links = []
+            links, seen = [], set()
             for node in container.css(self.selectors["articles"]):
                 href = node.attributes.get("href")
                 if href:
-                    if not href.startswith("http"):
-                        href = f"{self.base_url.rstrip('/')}/{href.lstrip('/')}"
-                    links.append(href)
+                    link = canonicalize_url(href, base=self.base_url)
+                    # Listings often link the same story from several teasers
+                    if link not in seen:
+                        seen.add(link)
+                        links.append(link)
 
             return links[:limit] if limit else links
         
@@ -0,0 +1,139 @@
+from datetime import datetime, timezone
+from pathlib import Path
+import asyncio
+import gzip
+import hashlib
+import httpx
+import json
+import logging
+import os
+
+from feed.scraper.utils import module_available
+
+logger = logging.getLogger(__name__)
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        import zstandard
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class PageArchive:
+    """On-disk archive of fetched article pages.
+
+    Bodies are compressed and stored once per content hash under
+    ``objects/<hash[:2]>/<hash>.<codec>``, so a page fetched again unchanged
+    costs no extra space. Each process appends to its own JSON-lines
+    segment under ``index/``; a record maps a URL to a body hash along with
+    the source, status, content type and fetch time. Later records win.
+    """
+
+    def __init__(self, root, codec: str = None):
+        self.root = Path(root)
+        if codec is None:
+            codec = "zst" if module_available("zstandard") else "gz"
+        elif codec == "zst" and not module_available("zstandard"):
+            logger.warning("zstd requested but the zstandard package is not installed, using gzip")
+            codec = "gz"
+        self.codec = codec
+        self._segment = None
+        self._records = None
+
+    def _object_path(self, digest: str, codec: str) -> Path:
+        return self.root / "objects" / digest[:2] / f"{digest}.{codec}"
+
+    def _segment_path(self) -> Path:
+        if self._segment is None:
+            stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+            self._segment = self.root / "index" / f"{stamp}-{os.getpid()}.jsonl"
+            self._segment.parent.mkdir(parents=True, exist_ok=True)
+        return self._segment
+
+    def store(self, url: str, content: bytes, content_type: str = "", status: int = 200,
+              source: str = None) -> str:
+        """Archive one response body and return its hash"""
+        digest = hashlib.sha256(content).hexdigest()
+
+        path = self._object_path(digest, self.codec)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".tmp{os.getpid()}")
+            tmp.write_bytes(_compress(content, self.codec))
+            tmp.replace(path)
+
+        record = {
+            "url": url,
+            "sha256": digest,
+            "codec": self.codec,
+            "source": source,
+            "status": status,
+            "content_type": content_type,
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+        }
+        with self._segment_path().open("a", encoding="utf-8") as segment:
+            segment.write(json.dumps(record) + "\n")
+
+        if self._records is not None:
+            self._records[url] = record
+        return digest
+
+    async def save(self, url: str, response, source: str = None) -> str:
+        """Archive a response or fetched Page off the event loop"""
+        return await asyncio.to_thread(
+            self.store, url, response.content,
+            response.headers.get("Content-Type", ""), response.status_code, source,
+        )
+
+    @property
+    def records(self) -> dict:
+        """Latest record per URL, read from every index segment on first use"""
+        if self._records is None:
+            self._records = {}
+            for segment in sorted((self.root / "index").glob("*.jsonl")):
+                with segment.open(encoding="utf-8") as lines:
+                    for line in lines:
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            # A run that died mid-write leaves a partial last line
+                            continue
+                        self._records[record["url"]] = record
+        return self._records
+
+    def get(self, url: str) -> dict | None:
+        return self.records.get(url)
+
+    def load(self, record: dict) -> bytes:
+        path = self._object_path(record["sha256"], record["codec"])
+        return _decompress(path.read_bytes(), record["codec"])
+
+    def urls_for(self, source: str) -> list:
+        return [url for url, record in self.records.items() if record.get("source") == source]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+
+class ArchiveTransport(httpx.AsyncBaseTransport):
+    """Serves archived pages in place of the network, 404 for anything else"""
+
+    def __init__(self, archive: PageArchive):
+        self.archive = archive
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        record = self.archive.get(str(request.url))
+        if record is None:
+            return httpx.Response(404, request=request)
+
+        content = await asyncio.to_thread(self.archive.load, record)
+        headers = {"Content-Type": record["content_type"]} if record.get("content_type") else {}
+        return httpx.Response(record["status"], headers=headers, content=content, request=request)
@@ -1,52 +1,166 @@
 import httpx
 from selectolax.parser import HTMLParser
 import trafilatura as traf
+from trafilatura.utils import load_html
 from newspaper import Article
 import json
 from datetime import datetime
-import re
 from urllib.parse import urlparse
 import logging
-import asyncio
+
+from feed.scraper.http_client import ScraperHttpClient, PageRejected
+from feed.scraper.extraction import (
+    ExtractionEngine, ExtractorRouter, run_in_extract_pool, extract_pool_is_process_based
+)
+from feed.scraper.dates import parse_date_string, first_date_in_text
+from feed.scraper.json_ld import JsonLdIndex
+from feed.scraper.archive import PageArchive
+from feed.metrics import metrics
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# CPU-bound extractors. These live at module level and only take and return
+# plain data so they can be shipped to the extraction process pool.
+
+def run_trafilatura(html, is_json: bool = False):
+    if is_json:
+        result = traf.extract(
+            html,
+            no_fallback=False,  # Allow fallback methods
+            output_format='json',
+            include_comments=False,
+            include_tables=True
+        )
+        return json.loads(result) if result else None
+
+    return traf.extract(
+        html,
+        no_fallback=False,
+        include_comments=False,
+        include_tables=True
+    )
+
+
+def run_newspaper(url: str, html: str):
+    article = Article(url)
+
+    # With input_html newspaper only stores the page we already fetched,
+    # a bare download() would request the URL a second time
+    article.download(input_html=html)
+    article.parse()
+
+    if not article.title and not article.text:
+        return None
+
+    publish_date = None
+    if article.publish_date:
+        if isinstance(article.publish_date, datetime):
+            publish_date = article.publish_date.isoformat()
+        else:
+            publish_date = str(article.publish_date)
+
+    return {
+        "title": article.title.strip() if article.title else "",
+        "text": article.text.strip() if article.text else "",
+        "authors": article.authors or [],
+        "publish_date": publish_date
+    }
+
+
 class ArticleScraper:
-    def __init__(self, url):
+    def __init__(self, url, client: ScraperHttpClient = None, archive: PageArchive = None,
+                 source: str = None):
         self.url = url
         self.html_content = None
         self.parser = None
+        self._lxml_tree = None
+        self._json_ld = None
+        self.fetch_error = None
+        # Stays set after release() drops the page itself
+        self.fetched = False
+        self.bytes_downloaded = 0
+        # Pages from one host share a date format, cache the winner per host
+        self.source_key = urlparse(url).netloc
+        # Scrapers share the run-scoped client; only standalone use opens its own
+        self._owns_client = client is None
+        self.client = client or ScraperHttpClient()
+        # Optional PageArchive keeping the raw page for later replay
+        self.archive = archive
+        self.source = source
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        if self._owns_client:
+            await self.client.aclose()
 
     async def fetch_article_page(self):
         
         if self.html_content:
             return self.html_content
         
-        async with httpx.AsyncClient(
-            headers={
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/115 Safari/537.36",
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                "Accept-Language": "en-US,en;q=0.9",
-                "Referer": "https://www.google.com/",
-                "Connection": "keep-alive",
-            },
-            timeout=30.0
-        ) as client:
-            try:
-                resp = await client.get(self.url)
-                resp.raise_for_status()
-                self.html_content = resp.text
-                self.parser = HTMLParser(self.html_content)
-                return self.html_content
-            except httpx.RequestError as e:
-                logger.error(f"Request failed for {self.url}: {e}")
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Bad status {e.response.status_code} for {self.url}")
+        # Each article page is requested at most once per run
+        if not self.client.claim(self.url):
+            logger.info(f"Skipping {self.url}, already fetched in this run")
+            return None
+
+        metrics.incr("article_pages_fetched")
+        try:
+            page = await self.client.fetch_page(self.url)
+            if not page.is_success:
+                self.fetch_error = f"HTTP {page.status_code}"
+                logger.error(f"Bad status {page.status_code} for {self.url}")
+                return None
+            self.bytes_downloaded = page.num_bytes_downloaded
+            self.fetched = True
+            self.html_content = page.text
+            self.parser = HTMLParser(self.html_content)
+            if self.archive is not None:
+                await self._archive_response(page)
+            return self.html_content
+        except PageRejected as e:
+            self.fetch_error = "PageRejected"
+            metrics.incr("pages_rejected")
+            logger.info(f"Rejected {e}")
+        except httpx.RequestError as e:
+            self.fetch_error = type(e).__name__
+            logger.error(f"Request failed for {self.url}: {e}")
+        finally:
+            # A failed fetch (bad status, timeout, open circuit, rejected page)
+            # gives the URL back so a later poll can try it again
+            if not self.fetched:
+                self.client.unclaim(self.url)
         return None
 
+    def release(self):
+        """Drop the page and every tree built from it once extraction is done"""
+        self.html_content = None
+        self.parser = None
+        self._lxml_tree = None
+        self._json_ld = None
+
+    async def _archive_response(self, page):
+        try:
+            await self.archive.save(self.url, page, source=self.source)
+            metrics.incr("pages_archived")
+        except OSError as e:
+            # A full disk must not cost us the article itself
+            logger.error(f"Failed to archive {self.url}: {e}")
+
+    @property
+    def lxml_tree(self):
+        """lxml tree for trafilatura, built once per page and only when needed"""
+        if self._lxml_tree is None and self.html_content:
+            self._lxml_tree = load_html(self.html_content)
+        return self._lxml_tree
+
     async def extract_title_multiple_methods(self):
         """Extract title using multiple methods with fallbacks"""
         titles = []
@@ -105,41 +219,43 @@ class ArticleScraper:
         return titles[0] if titles else None
 
     async def extract_date_multiple_methods(self):
-        """Extract publication date using multiple methods"""
-        dates = []
-        
+        """Extract publication date, stopping at the first candidate that parses"""
         if not self.html_content:
             await self.fetch_article_page()
             
         if not self.parser:
             return None
 
-        # Method 1: Meta property article:published_time
-        article_published = self.parser.css_first('meta[property="article:published_time"]')
-        if article_published and article_published.attributes.get('content'):
-            dates.append(article_published.attributes['content'])
+        for date_str in self.iter_date_candidates():
+            parsed_date = self.parse_date_string(date_str)
+            if parsed_date:
+                return parsed_date
 
-        # Method 2: Meta property og:published_time  
-        og_published = self.parser.css_first('meta[property="og:published_time"]')
-        if og_published and og_published.attributes.get('content'):
-            dates.append(og_published.attributes['content'])
+        # Method 7: Text pattern matching for dates, only when the markup had nothing
+        return first_date_in_text(self.html_content, self.source_key)
 
+    def iter_date_candidates(self):
+        """Yield date strings from the markup, most reliable first"""
+        # Method 1: Meta property article:published_time
+        # Method 2: Meta property og:published_time
         # Method 3: Meta name publish_date
-        publish_date = self.parser.css_first('meta[name="publish_date"]')
-        if publish_date and publish_date.attributes.get('content'):
-            dates.append(publish_date.attributes['content'])
+        for selector in ('meta[property="article:published_time"]',
+                         'meta[property="og:published_time"]',
+                         'meta[name="publish_date"]'):
+            meta = self.parser.css_first(selector)
+            if meta and meta.attributes.get('content'):
+                yield meta.attributes['content']
 
         # Method 4: Time elements with datetime attribute
-        time_elements = self.parser.css('time[datetime]')
-        for time_elem in time_elements:
+        for time_elem in self.parser.css('time[datetime]'):
             datetime_attr = time_elem.attributes.get('datetime')
             if datetime_attr:
-                dates.append(datetime_attr)
+                yield datetime_attr
 
         # Method 5: JSON-LD structured data
         json_ld_date = self.extract_from_json_ld('datePublished')
         if json_ld_date:
-            dates.append(json_ld_date)
+            yield json_ld_date
 
         # Method 6: Date-specific selectors
         date_selectors = [
@@ -155,93 +271,28 @@ class ArticleScraper:
             element = self.parser.css_first(selector)
             if element:
                 if element.attributes.get('datetime'):
-                    dates.append(element.attributes['datetime'])
+                    yield element.attributes['datetime']
                 elif element.text():
-                    dates.append(element.text().strip())
-
-        # Method 7: Text pattern matching for dates
-        if self.html_content:
-            date_patterns = [
-                r'\b\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}',  # ISO format
-                r'\b\d{4}-\d{2}-\d{2}',  # YYYY-MM-DD
-                r'\b(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},\s+\d{4}',  # Month DD, YYYY
-            ]
-            
-            for pattern in date_patterns:
-                matches = re.findall(pattern, self.html_content, re.IGNORECASE)
-                dates.extend(matches)
+                    yield element.text().strip()
 
-        # Clean and parse dates
-        parsed_dates = []
-        for date_str in dates:
-            parsed_date = self.parse_date_string(date_str)
-            if parsed_date:
-                parsed_dates.append(parsed_date)
-
-        return parsed_dates[0] if parsed_dates else None
+    @property
+    def json_ld(self) -> JsonLdIndex:
+        """All JSON-LD on the page, parsed on first use and shared by every extractor"""
+        if not self.parser:
+            return JsonLdIndex(())
+        if self._json_ld is None:
+            self._json_ld = JsonLdIndex.from_parser(self.parser)
+        return self._json_ld
 
     def extract_from_json_ld(self, field):
         """Extract data from JSON-LD structured data"""
         if not self.parser:
             return None
-            
-        json_scripts = self.parser.css('script[type="application/ld+json"]')
-        
-        for script in json_scripts:
-            try:
-                data = json.loads(script.text())
-                
-                # Handle arrays of JSON-LD objects
-                if isinstance(data, list):
-                    for item in data:
-                        if isinstance(item, dict) and field in item:
-                            return item[field]
-                elif isinstance(data, dict):
-                    # Direct field access
-                    if field in data:
-                        return data[field]
-                    
-                    # Check in @graph array
-                    if '@graph' in data:
-                        for item in data['@graph']:
-                            if isinstance(item, dict) and field in item:
-                                return item[field]
-                                
-            except (json.JSONDecodeError, KeyError):
-                continue
-                
-        return None
+        return self.json_ld.text(field)
 
     def parse_date_string(self, date_str):
         """Parse various date string formats"""
-        if not date_str:
-            return None
-            
-        # Clean the date string
-        date_str = date_str.strip()
-        
-        # Common date formats to try
-        date_formats = [
-            '%Y-%m-%dT%H:%M:%S%z',      # ISO with timezone
-            '%Y-%m-%dT%H:%M:%SZ',       # ISO UTC
-            '%Y-%m-%dT%H:%M:%S',        # ISO without timezone
-            '%Y-%m-%d %H:%M:%S',        # SQL datetime
-            '%Y-%m-%d',                 # YYYY-MM-DD
-            '%B %d, %Y',                # Month DD, YYYY
-            '%b %d, %Y',                # Mon DD, YYYY
-            '%d %B %Y',                 # DD Month YYYY
-            '%d %b %Y',                 # DD Mon YYYY
-            '%m/%d/%Y',                 # MM/DD/YYYY
-            '%d/%m/%Y',                 # DD/MM/YYYY
-        ]
-        
-        for fmt in date_formats:
-            try:
-                return datetime.strptime(date_str, fmt)
-            except ValueError:
-                continue
-                
-        return None
+        return parse_date_string(date_str, self.source_key)
 
     def clean_title(self, title):
         """Clean and normalize title text"""
@@ -282,61 +333,15 @@ class ArticleScraper:
                 logging.error("No URL provided for scraping")
                 return None
 
-            article = Article(self.url)
-            
             try:
-                # Method 1: Try as a method call
-                if hasattr(article, 'article_html') and callable(article.article_html):
-                    article.article_html(self.html_content)
-                # Method 2: Try setting as property
-                elif hasattr(article, 'article_html'):
-                    article.article_html = self.html_content
-                # Method 3: Try set_html method (newer versions)
-                elif hasattr(article, 'set_html') and callable(article.set_html):
-                    article.set_html(self.html_content)
-                # Method 4: Try setting html property directly
-                elif hasattr(article, 'html'):
-                    article.html = self.html_content
-                else:
-                    logging.error("Unable to set HTML content on Article object")
-                    return None
-            except Exception as html_error:
-                logging.error(f"Failed to set HTML content: {html_error}")
-                return None
-
-            def parse_article():
-                article.download()
-                article.parse()
-                return article
-            
-            try:
-                loop = asyncio.get_event_loop()
-                article = await loop.run_in_executor(None, parse_article)
+                result = await run_in_extract_pool(run_newspaper, self.url, self.html_content)
             except Exception as parse_error:
                 logging.error(f"Failed to parse article: {parse_error}")
                 return None
 
-
-            if not article.title and not article.text:
+            if not result:
                 logging.warning(f"Failed to extract meaningful content from {self.url}")
-                return None
-            
-            publish_date = None
-            if article.publish_date:
-                if isinstance(article.publish_date, datetime):
-                    publish_date = article.publish_date.isoformat()
-                else:
-                    publish_date = str(article.publish_date)
-
-            text_content = article.text.strip() if article.text else ""
-            title = article.title.strip() if article.title else ""
-
-            return {
-                "title": title,
-                "text": text_content,
-                "authors": article.authors or [],
-                "publish_date": publish_date
-                }
+            return result
         
         except ImportError as e:
             logging.error(f"newspaper3k library not available: {e}")
@@ -356,97 +361,48 @@ class ArticleScraper:
         if not self.html_content:
             return None
             
-        if is_json:
-            result = traf.extract(
-                self.html_content, 
-                no_fallback=False,  # Allow fallback methods
-                output_format='json',
-                include_comments=False,
-                include_tables=True
-                    ) 
-            return json.loads(result)
-        else:
-            return traf.extract(
-                self.html_content,
-                no_fallback=False,
-                include_comments=False,
-                include_tables=True
-                    )
-                    
-            
+        if extract_pool_is_process_based():
+            # lxml trees can't be pickled, workers parse the raw html themselves
+            return await run_in_extract_pool(run_trafilatura, self.html_content, is_json)
+
+        # The tree is built inside the worker thread, parsing never blocks the event loop
+        return await run_in_extract_pool(self._trafilatura_on_tree, is_json)
 
-    async def extract_comprehensive(self):
-        """Extract article data using all available methods"""
+    def _trafilatura_on_tree(self, is_json: bool):
+        return run_trafilatura(self.lxml_tree, is_json)
+
+    async def extract_comprehensive(self, router: ExtractorRouter = None, site: dict = None):
+        """Extract article data, stopping once title, date and text are found.
+
+        With a router the stages run in the order learned for the site, a
+        site's "extractor" entry in sites.json pins the stage to try first.
+        """
         result = {
             'url': self.url,
             'title': None,
             'date': None,
             'text': None,
             'authors': None,
-            'extraction_method': None
+            'extraction_method': None,
+            'field_sources': {}
         }
         
-        # Try multiple extraction methods
-        methods = []
-
         if not self.html_content:
             await self.fetch_article_page()
 
         if not self.html_content:
             result["extraction_method"] = "failed to fetch"
             return result
-        
-        # Method 1: Custom extraction
-        try:
-            title = await self.extract_title_multiple_methods()
-            date = await self.extract_date_multiple_methods()
-            if title or date:
-                methods.append('custom_selectors')
-                if title:
-                    result['title'] = title
-                if date:
-                    result['date'] = date
-        except Exception as e:
-            logger.error(f"Custom extraction failed: {e}")
-
-        # Method 2: Trafilatura with JSON
-        try:
-            traf_result = await self.trafilatura_scraper(is_json=True)
-            if traf_result:
-                methods.append('trafilatura')
-                if not result['title'] and traf_result.get('title'):
-                    result['title'] = traf_result['title']
-                if not result['date'] and traf_result.get('date'):
-                    result['date'] = traf_result['date']
-                if not result['text'] and traf_result.get('text'):
-                    result['text'] = traf_result['text']
-                if not result['authors'] and traf_result.get('author'):
-                    result['authors'] = [traf_result['author']] if isinstance(traf_result['author'], str) else traf_result['author']
-        except Exception as e:
-            logger.error(f"Trafilatura JSON extraction failed: {e}")
 
-        # Method 3: Newspaper3k
+        site = site or {}
+        engine = ExtractionEngine(self, router=router, source=site.get("name"), pinned=site.get("extractor"))
         try:
-            newspaper_result = await self.newspaper_scraper()
-            if newspaper_result:
-                methods.append('newspaper')
-                if not result['title'] and newspaper_result.get('title'):
-                    result['title'] = newspaper_result['title']
-                if not result['date'] and newspaper_result.get('publish_date'):
-                    result['date'] = newspaper_result['publish_date']
-                if not result['text'] and newspaper_result.get('text'):
-                    result['text'] = newspaper_result['text']
-                if not result['authors'] and newspaper_result.get('authors'):
-                    result['authors'] = newspaper_result['authors']
-        except Exception as e:
-            logger.error(f"Newspaper extraction failed: {e}")
-
-        result['extraction_method'] = ', '.join(methods) if methods else 'none'
-        
-        # Clean up the client
-        self.client.close()
-        
-        return result
+            with metrics.timer("extract_comprehensive"):
+                return await engine.run(result)
+        finally:
+            # Only the result is needed from here on, don't hold the page
+            # and its trees until the caller lets go of the scraper
+            self.release()
 
 # def main():
 #     url = "https://www.infoworld.com/article/4030321/teradata-joins-snowflake-databricks-in-expanding-mcp-ecosystem.html"
@@ -0,0 +1,86 @@
+from datetime import datetime
+import re
+
+# Fallback formats for strings fromisoformat can't read, most common first
+DATE_FORMATS = (
+    '%Y-%m-%dT%H:%M:%S%z',      # ISO with timezone
+    '%Y-%m-%dT%H:%M:%SZ',       # ISO UTC
+    '%Y-%m-%dT%H:%M:%S',        # ISO without timezone
+    '%Y-%m-%d %H:%M:%S',        # SQL datetime
+    '%Y-%m-%d',                 # YYYY-MM-DD
+    '%B %d, %Y',                # Month DD, YYYY
+    '%b %d, %Y',                # Mon DD, YYYY
+    '%d %B %Y',                 # DD Month YYYY
+    '%d %b %Y',                 # DD Mon YYYY
+    '%m/%d/%Y',                 # MM/DD/YYYY
+    '%d/%m/%Y',                 # DD/MM/YYYY
+)
+
+# Day and month can swap places in these, "03/04/2024" parses under both.
+# Caching one per source would pin whichever a single page happened to
+# allow, so they are always tried afresh in the order above.
+AMBIGUOUS_FORMATS = frozenset(('%m/%d/%Y', '%d/%m/%Y'))
+
+# Patterns scanned over the raw HTML as a last resort, in priority order
+TEXT_DATE_PATTERNS = (
+    re.compile(r'\b\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}'),  # ISO format
+    re.compile(r'\b\d{4}-\d{2}-\d{2}'),  # YYYY-MM-DD
+    re.compile(
+        r'\b(?:January|February|March|April|May|June|July|August|September|October|November|December)'
+        r'\s+\d{1,2},\s+\d{4}',
+        re.IGNORECASE
+    ),  # Month DD, YYYY
+)
+
+_ISO_PREFIX = re.compile(r'^\d{4}-\d{2}-\d{2}')
+
+# Winning strptime format per source, tried before the full list
+_format_cache = {}
+
+
+def parse_date_string(date_str, source: str = None):
+    """Parse a date string, trying the ISO fast path and the source's last format first"""
+    if not date_str or not isinstance(date_str, str):
+        return None
+
+    date_str = date_str.strip()
+
+    if _ISO_PREFIX.match(date_str):
+        try:
+            return datetime.fromisoformat(date_str)
+        except ValueError:
+            pass
+
+    cached = _format_cache.get(source)
+    if cached:
+        try:
+            return datetime.strptime(date_str, cached)
+        except ValueError:
+            pass
+
+    for fmt in DATE_FORMATS:
+        if fmt == cached:
+            continue
+        try:
+            parsed = datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+        if source is not None and fmt not in AMBIGUOUS_FORMATS:
+            _format_cache[source] = fmt
+        return parsed
+
+    return None
+
+
+def first_date_in_text(text: str, source: str = None):
+    """Scan text lazily and return the first parseable date, by pattern priority"""
+    if not text:
+        return None
+
+    for pattern in TEXT_DATE_PATTERNS:
+        for match in pattern.finditer(text):
+            parsed = parse_date_string(match.group(0), source)
+            if parsed:
+                return parsed
+
+    return None
@@ -0,0 +1,234 @@
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import logging
+import multiprocessing
+import random
+
+from feed.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Optional process pool for the CPU-heavy extractors. Without it they run on
+# the default thread executor, which keeps the event loop free but still
+# serializes parsing on the GIL.
+_extract_pool = None
+
+
+def configure_extract_pool(workers: int):
+    global _extract_pool
+    shutdown_extract_pool()
+    if workers and workers > 0:
+        # Workers are started on demand, by then the event loop and the HTTP
+        # client's threads exist and must not be forked along with them
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _extract_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+        logger.info(f"Extraction pool started with {workers} worker processes ({method})")
+
+
+def shutdown_extract_pool():
+    global _extract_pool
+    if _extract_pool is not None:
+        _extract_pool.shutdown(wait=True, cancel_futures=True)
+        _extract_pool = None
+
+
+def extract_pool_is_process_based() -> bool:
+    return _extract_pool is not None
+
+
+async def run_in_extract_pool(func, *args):
+    """Run a picklable extractor off the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_extract_pool, func, *args)
+
+# A page is done once all of these are filled, later stages are skipped
+REQUIRED_FIELDS = ("title", "date", "text")
+RESULT_FIELDS = ("title", "date", "text", "authors")
+
+
+class ExtractionEngine:
+    """Run extraction stages in order over one fetched page.
+
+    The scraper holds the parsed trees, so every stage works off the same
+    parse. Each stage only fills fields that are still empty and the engine
+    stops as soon as the required fields are present.
+    """
+
+    # JSON-LD is nearly free once the page is parsed and often complete on
+    # its own, so it goes first and can spare the heavy extractors entirely
+    DEFAULT_STAGES = ("json_ld", "custom_selectors", "trafilatura", "newspaper")
+
+    def __init__(self, scraper, stages: tuple = None, required: tuple = REQUIRED_FIELDS,
+                 router: "ExtractorRouter" = None, source: str = None, pinned=None):
+        self.scraper = scraper
+        self.required = required
+        self.router = router
+        self.source = source
+        if stages is None and router is not None:
+            stages = router.order_for(source, pinned)
+        self.stages = stages or self.DEFAULT_STAGES
+
+    def is_complete(self, result: dict) -> bool:
+        return all(result.get(field) for field in self.required)
+
+    async def run(self, result: dict) -> dict:
+        """Fill ``result`` in place and record which stage supplied each field"""
+        field_sources = {}
+        methods = []
+
+        for stage in self.stages:
+            if self.is_complete(result):
+                break
+
+            try:
+                with metrics.timer(f"extract_{stage}"):
+                    fields = await getattr(self, f"stage_{stage}")()
+            except Exception as e:
+                logger.error(f"{stage} extraction failed for {self.scraper.url}: {e}")
+                metrics.record_extractor(stage, won=False)
+                if self.router is not None:
+                    self.router.record(self.source, stage, None)
+                continue
+
+            metrics.incr("extractions")
+            if self.router is not None:
+                self.router.record(self.source, stage, fields)
+
+            if not fields:
+                metrics.record_extractor(stage, won=False)
+                continue
+
+            methods.append(stage)
+            won = False
+            for field in RESULT_FIELDS:
+                if not result.get(field) and fields.get(field):
+                    result[field] = fields[field]
+                    field_sources[field] = stage
+                    won = True
+            metrics.record_extractor(stage, won)
+
+        result['extraction_method'] = ', '.join(methods) if methods else 'none'
+        result['field_sources'] = field_sources
+        return result
+
+    # Stages return a dict using the RESULT_FIELDS keys
+
+    async def stage_json_ld(self):
+        if not self.scraper.html_content:
+            await self.scraper.fetch_article_page()
+        if not self.scraper.parser:
+            return None
+
+        json_ld = self.scraper.json_ld
+        if not json_ld:
+            return None
+
+        headline = json_ld.text('headline') or json_ld.text('name')
+        date = (self.scraper.parse_date_string(json_ld.text('datePublished'))
+                or self.scraper.parse_date_string(json_ld.text('dateModified')))
+        return {
+            'title': self.scraper.clean_title(headline) if headline else None,
+            'date': date,
+            'text': json_ld.text('articleBody'),
+            'authors': json_ld.authors() or None,
+        }
+
+    async def stage_custom_selectors(self):
+        return {
+            'title': await self.scraper.extract_title_multiple_methods(),
+            'date': await self.scraper.extract_date_multiple_methods(),
+        }
+
+    async def stage_trafilatura(self):
+        traf_result = await self.scraper.trafilatura_scraper(is_json=True)
+        if not traf_result:
+            return None
+
+        authors = traf_result.get('author')
+        return {
+            'title': traf_result.get('title'),
+            'date': traf_result.get('date'),
+            'text': traf_result.get('text'),
+            'authors': [authors] if isinstance(authors, str) else authors,
+        }
+
+    async def stage_newspaper(self):
+        newspaper_result = await self.scraper.newspaper_scraper()
+        if not newspaper_result:
+            return None
+
+        return {
+            'title': newspaper_result.get('title'),
+            'date': newspaper_result.get('publish_date'),
+            'text': newspaper_result.get('text'),
+            'authors': newspaper_result.get('authors'),
+        }
+
+
+class ExtractorRouter:
+    """Learns which extraction stage to start with for each source.
+
+    For every (source, stage) it counts attempts, how many of the required
+    fields the stage returned and how often it returned all of them. A
+    stage's completeness is measured only on the pages it actually ran on,
+    and later stages only run where earlier ones fell short, so the rates
+    of different stages are not comparable head to head. Instead the
+    cheapest stage, in DEFAULT_STAGES order, whose completeness reaches
+    ``complete_threshold`` after ``min_attempts`` runs goes first. A small
+    ``explore_rate`` keeps the default order in play so the other stages'
+    stats don't go stale. A stage pinned in sites.json always goes first.
+    """
+
+    def __init__(self, stats: dict = None, min_attempts: int = 5, explore_rate: float = 0.05,
+                 complete_threshold: float = 0.8, required: tuple = REQUIRED_FIELDS):
+        # {(source, stage): {"attempts": n, "fields": n, "complete": n}}
+        self.stats = defaultdict(lambda: {"attempts": 0, "fields": 0, "complete": 0})
+        self.stats.update(stats or {})
+        self.min_attempts = min_attempts
+        self.explore_rate = explore_rate
+        self.complete_threshold = complete_threshold
+        self.required = required
+        self.dirty = set()
+
+    def completeness(self, source: str, stage: str):
+        """Share of the stage's own runs that filled every required field"""
+        stat = self.stats.get((source, stage))
+        if not stat or stat["attempts"] < self.min_attempts:
+            return None
+        return stat["complete"] / stat["attempts"]
+
+    def order_for(self, source: str, pinned=None) -> tuple:
+        stages = list(ExtractionEngine.DEFAULT_STAGES)
+
+        if pinned:
+            pinned = [pinned] if isinstance(pinned, str) else list(pinned)
+            unknown = [stage for stage in pinned if stage not in stages]
+            if unknown:
+                logger.warning(f"Ignoring unknown extractors pinned for {source}: {unknown}")
+            pinned = [stage for stage in pinned if stage in stages]
+            return tuple(pinned + [stage for stage in stages if stage not in pinned])
+
+        if random.random() < self.explore_rate:
+            return tuple(stages)
+
+        # Stages are listed cheapest first, the first good enough one wins
+        for stage in stages:
+            completeness = self.completeness(source, stage)
+            if completeness is not None and completeness >= self.complete_threshold:
+                return tuple([stage] + [other for other in stages if other != stage])
+
+        # Nothing is reliable yet, the default order lets the early exit
+        # stop at the cheapest stage that happens to work
+        return tuple(stages)
+
+    def record(self, source: str, stage: str, fields: dict | None):
+        if source is None:
+            return
+        supplied = sum(1 for field in self.required if fields and fields.get(field))
+        stat = self.stats[(source, stage)]
+        stat["attempts"] += 1
+        stat["fields"] += supplied
+        if supplied == len(self.required):
+            stat["complete"] += 1
+        self.dirty.add((source, stage))
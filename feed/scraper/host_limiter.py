@@ -0,0 +1,117 @@
+from urllib.parse import urlsplit
+import asyncio
+import logging
+import time
+
+from feed.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Statuses that mean the host wants us to slow down
+THROTTLE_STATUSES = {429, 503}
+
+
+class HostState:
+    """Token bucket plus an AIMD concurrency window for one host"""
+
+    def __init__(self, rate: float, burst: int, concurrency: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+        self.limit = concurrency
+        self.in_flight = 0
+        self.condition = asyncio.Condition()
+        self.latency = None  # EWMA in seconds
+
+    def take_token(self) -> float:
+        """Take a token if one is available, else return the seconds to wait"""
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class HostLimiter:
+    """Per-host politeness and adaptive concurrency for every fetch.
+
+    Each host gets a token bucket (``rate`` requests per second, bursts of
+    ``burst``) and a concurrency window that grows additively while
+    responses are fast and healthy, and halves on errors, throttling
+    statuses or latency above ``latency_target``.
+    """
+
+    def __init__(self, rate: float = 5.0, burst: int = 10, initial_concurrency: int = 4,
+                 min_concurrency: int = 1, max_concurrency: int = 16, latency_target: float = 3.0):
+        self.rate = rate
+        self.burst = burst
+        self.initial_concurrency = initial_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.latency_target = latency_target
+        self.hosts = {}
+
+    def host_for(self, url: str) -> str:
+        return (urlsplit(url).hostname or "").lower()
+
+    def state(self, host: str) -> HostState:
+        state = self.hosts.get(host)
+        if state is None:
+            state = HostState(self.rate, self.burst, self.initial_concurrency)
+            self.hosts[host] = state
+        return state
+
+    async def acquire(self, host: str):
+        state = self.state(host)
+
+        async with state.condition:
+            await state.condition.wait_for(lambda: state.in_flight < int(state.limit))
+            state.in_flight += 1
+
+        try:
+            while (wait := state.take_token()) > 0:
+                metrics.incr("host_throttle_waits")
+                await asyncio.sleep(wait)
+        except BaseException:
+            # Cancelled while waiting for a token, the slot was never used
+            await self._free_slot(state)
+            raise
+
+    async def release(self, host: str, latency: float, status: int = None, error: bool = False,
+                      retry_after: float = None):
+        state = self.state(host)
+        state.latency = latency if state.latency is None else 0.8 * state.latency + 0.2 * latency
+
+        if error or status in THROTTLE_STATUSES or state.latency > self.latency_target:
+            # Multiplicative decrease
+            state.limit = max(self.min_concurrency, state.limit / 2)
+            if retry_after:
+                state.paused_until = time.monotonic() + retry_after
+            logger.debug(f"Backing off {host}: concurrency {state.limit:.1f}")
+        elif status is not None and status < 400:
+            # Additive increase, roughly +1 per window of successful requests
+            state.limit = min(self.max_concurrency, state.limit + 1 / state.limit)
+
+        await self._free_slot(state)
+
+    async def _free_slot(self, state: HostState):
+        async with state.condition:
+            state.in_flight -= 1
+            state.condition.notify_all()
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
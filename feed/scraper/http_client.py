@@ -0,0 +1,291 @@
+from contextlib import asynccontextmanager
+import asyncio
+import httpx
+import logging
+import time
+
+from feed.metrics import metrics
+from feed.scraper.host_limiter import HostLimiter, parse_retry_after
+from feed.scraper.retry import RetryPolicy, CircuitBreaker
+from feed.scraper.utils import module_available
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/115 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Referer": "https://www.google.com/",
+}
+
+
+# Article pages with any other declared type are rejected before the body is read
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+DEFAULT_MAX_PAGE_BYTES = 5_000_000
+
+
+class PageRejected(httpx.RequestError):
+    """Raised when a page is not HTML or larger than the allowed body size"""
+
+
+class Page:
+    """A fully read article page, with the response metadata scrapers need"""
+
+    def __init__(self, url: str, status_code: int, headers, content: bytes = b"",
+                 encoding: str = None, num_bytes_downloaded: int = 0):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding or "utf-8"
+        self.num_bytes_downloaded = num_bytes_downloaded
+
+    @property
+    def is_success(self) -> bool:
+        return 200 <= self.status_code < 300
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+
+class ScraperHttpClient:
+    """Run-scoped transport shared by every scraper.
+
+    httpx keeps one connection pool per origin, so a single client gives us
+    keep-alive and TLS session reuse for every article on the same host.
+    """
+
+    def __init__(self, max_connections: int = 100, max_keepalive: int = 20,
+                 timeout: float = 30.0, http2: bool = False, headers: dict = None,
+                 feed_state=None, limiter: HostLimiter = None, retry: RetryPolicy = None,
+                 breaker: CircuitBreaker = None, transport: httpx.AsyncBaseTransport = None,
+                 max_page_bytes: int = DEFAULT_MAX_PAGE_BYTES):
+        if http2 and not module_available("h2"):
+            logger.warning("HTTP/2 requested but the h2 package is not installed, using HTTP/1.1")
+            http2 = False
+
+        self.http2 = http2
+        self.headers = {**DEFAULT_HEADERS, **(headers or {})}
+        self.client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=httpx.Timeout(timeout, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+                keepalive_expiry=30.0,
+            ),
+            http2=http2,
+            follow_redirects=True,
+            transport=transport,
+        )
+        self.claimed_urls = set()
+        # Optional FeedStateStore holding ETag / Last-Modified validators
+        self.feed_state = feed_state
+        # Every request goes through the per-host limiter
+        self.limiter = limiter or HostLimiter()
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.max_page_bytes = max_page_bytes
+
+    def claim(self, url: str) -> bool:
+        """Reserve a page URL for this run, False if it was already fetched"""
+        if url in self.claimed_urls:
+            metrics.incr("duplicate_fetches_skipped")
+            return False
+        self.claimed_urls.add(url)
+        return True
+
+    def unclaim(self, url: str):
+        """Give a URL back after a failed fetch so a later poll can try it again"""
+        self.claimed_urls.discard(url)
+
+    def clear_claims(self):
+        self.claimed_urls.clear()
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        """GET with retries on transport errors and retryable statuses"""
+        return await self._request(url, None, **kwargs)
+
+    async def fetch_page(self, url: str, max_bytes: int = None,
+                         content_types: tuple = HTML_CONTENT_TYPES, **kwargs) -> Page:
+        """GET an article page as a stream, with the same retries as ``get``.
+
+        Non-HTML content types and bodies over ``max_bytes`` raise
+        PageRejected as soon as they are detected, so neither is ever held
+        in memory in full. Error responses come back without their body.
+        """
+        max_bytes = max_bytes or self.max_page_bytes
+
+        async def read(response: httpx.Response) -> Page:
+            page = Page(url, response.status_code, response.headers, encoding=response.encoding)
+            if not response.is_success:
+                return page
+
+            content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+            if content_type and content_types and content_type not in content_types:
+                raise PageRejected(f"Content type {content_type} for {url}", request=response.request)
+
+            declared = response.headers.get("Content-Length", "")
+            if declared.isdigit() and int(declared) > max_bytes:
+                raise PageRejected(f"Body of {declared} bytes for {url}", request=response.request)
+
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body.extend(chunk)
+                if len(body) > max_bytes:
+                    raise PageRejected(f"Body over {max_bytes} bytes for {url}", request=response.request)
+
+            page.content = bytes(body)
+            page.num_bytes_downloaded = response.num_bytes_downloaded
+            return page
+
+        return await self._request(url, read, **kwargs)
+
+    async def _request(self, url: str, reader, **kwargs):
+        """Retry loop shared by ``get`` and ``fetch_page``.
+
+        Without a reader the body is read by httpx as usual. With one the
+        response is streamed and ``reader`` consumes it inside the host
+        slot, its return value replaces the response.
+        """
+        host = self.limiter.host_for(url)
+
+        for attempt in range(self.retry.attempts):
+            last_attempt = attempt + 1 >= self.retry.attempts
+            trial = self.breaker.check(host)
+
+            try:
+                async with self.host_slot(url) as slot:
+                    if reader is None:
+                        response = await self.client.get(url, **kwargs)
+                        slot["response"] = response
+                    else:
+                        response = await self.client.send(
+                            self.client.build_request("GET", url, **kwargs), stream=True
+                        )
+                        slot["response"] = response
+                        try:
+                            result = await reader(response)
+                        finally:
+                            await response.aclose()
+            except httpx.TransportError as e:
+                self.breaker.record_failure(host)
+                if last_attempt:
+                    raise
+                logger.info(f"Retrying {url} after {type(e).__name__}")
+                metrics.incr("retries")
+                await asyncio.sleep(self.retry.delay(attempt))
+                continue
+            except BaseException:
+                # Rejected page or cancellation, no verdict on the host
+                if trial:
+                    self.breaker.release_trial(host)
+                raise
+
+            if not self.retry.is_retryable(response.status_code):
+                self.breaker.record_success(host)
+                return response if reader is None else result
+
+            self.breaker.record_failure(host)
+            if last_attempt:
+                return response if reader is None else result
+            logger.info(f"Retrying {url} after status {response.status_code}")
+            metrics.incr("retries")
+            await asyncio.sleep(
+                self.retry.delay(attempt, parse_retry_after(response.headers.get("Retry-After")))
+            )
+
+    @asynccontextmanager
+    async def host_slot(self, url: str):
+        """Hold a per-host slot for the duration of a request and feed the outcome back"""
+        host = self.limiter.host_for(url)
+        await self.limiter.acquire(host)
+        metrics.incr("network_fetches")
+
+        slot = {"response": None}
+        start = time.monotonic()
+        error = False
+        try:
+            yield slot
+        except httpx.TransportError:
+            error = True
+            raise
+        finally:
+            response = slot["response"]
+            elapsed = time.monotonic() - start
+            metrics.observe("fetch", elapsed)
+            if response is not None:
+                metrics.incr("bytes_downloaded", response.num_bytes_downloaded)
+            await self.limiter.release(
+                host,
+                elapsed,
+                status=response.status_code if response is not None else None,
+                error=error,
+                retry_after=parse_retry_after(response.headers.get("Retry-After")) if response is not None else None,
+            )
+
+    async def get_if_modified(self, url: str, **kwargs):
+        """Conditional GET for feeds and listings, None when the server answers 304"""
+        if self.feed_state is None:
+            return await self.get(url, **kwargs)
+
+        headers = {**kwargs.pop("headers", {}), **self.feed_state.conditional_headers(url)}
+        response = await self.get(url, headers=headers, **kwargs)
+        if response.status_code == 304:
+            metrics.incr("not_modified")
+            self.feed_state.record_response(url, response)
+            return None
+
+        if response.is_success:
+            self.feed_state.record_response(url, response)
+        return response
+
+    @asynccontextmanager
+    async def stream_if_modified(self, url: str, **kwargs):
+        """Streaming conditional GET, yields None when the server answers 304.
+
+        Validators are only recorded once the caller has consumed the body
+        without raising, so a half-read document is fetched again next time.
+        """
+        headers = dict(kwargs.pop("headers", {}))
+        if self.feed_state is not None:
+            headers.update(self.feed_state.conditional_headers(url))
+
+        # Streams are not retried since the body may be partly consumed,
+        # they still feed and respect the circuit breaker
+        host = self.limiter.host_for(url)
+        trial = self.breaker.check(host)
+        try:
+            async with self.host_slot(url) as slot, \
+                    self.client.stream("GET", url, headers=headers, **kwargs) as response:
+                slot["response"] = response
+                if self.retry.is_retryable(response.status_code):
+                    self.breaker.record_failure(host)
+                else:
+                    self.breaker.record_success(host)
+
+                if response.status_code == 304:
+                    metrics.incr("not_modified")
+                    yield None
+                else:
+                    yield response
+
+                if self.feed_state is not None and (response.status_code == 304 or response.is_success):
+                    self.feed_state.record_response(url, response)
+        except httpx.TransportError:
+            self.breaker.record_failure(host)
+            raise
+        except BaseException:
+            if trial:
+                self.breaker.release_trial(host)
+            raise
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
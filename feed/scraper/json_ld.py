@@ -0,0 +1,82 @@
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Objects of these types win over breadcrumbs, organizations and the like
+ARTICLE_TYPES = {
+    "Article", "NewsArticle", "BlogPosting", "ReportageNewsArticle", "AnalysisNewsArticle",
+    "OpinionNewsArticle", "TechArticle", "LiveBlogPosting", "Report", "ScholarlyArticle",
+}
+
+
+def _types(obj: dict) -> set:
+    value = obj.get("@type")
+    if isinstance(value, list):
+        return set(value)
+    return {value} if value else set()
+
+
+class JsonLdIndex:
+    """Every JSON-LD block of a page, parsed once and flattened.
+
+    Top-level objects, lists, ``@graph`` members and nested objects are all
+    collected in ``objects``. Fields are only resolved from the article-typed
+    objects among them, so a WebSite, Organization or ImageObject never
+    supplies an article's title or date.
+    """
+
+    def __init__(self, scripts):
+        self.objects = []
+        for text in scripts:
+            try:
+                self._collect(json.loads(text, strict=False))
+            except (json.JSONDecodeError, TypeError, ValueError):
+                continue
+
+        self.articles = [obj for obj in self.objects if _types(obj) & ARTICLE_TYPES]
+
+        # First value per field across the article objects, their own keys only
+        self.fields = {}
+        for obj in self.articles:
+            for key, value in obj.items():
+                if value not in (None, "", [], {}):
+                    self.fields.setdefault(key, value)
+
+    @classmethod
+    def from_parser(cls, parser) -> "JsonLdIndex":
+        return cls(script.text() for script in parser.css('script[type="application/ld+json"]'))
+
+    def _collect(self, node):
+        if isinstance(node, list):
+            for item in node:
+                self._collect(item)
+        elif isinstance(node, dict):
+            self.objects.append(node)
+            for value in node.values():
+                if isinstance(value, (dict, list)):
+                    self._collect(value)
+
+    def __bool__(self):
+        return bool(self.articles)
+
+    def get(self, field: str):
+        return self.fields.get(field)
+
+    def text(self, field: str) -> str | None:
+        """A field as a plain string, first element for lists"""
+        value = self.fields.get(field)
+        if isinstance(value, list):
+            value = next((item for item in value if isinstance(item, str)), None)
+        return value.strip() if isinstance(value, str) and value.strip() else None
+
+    def authors(self) -> list:
+        value = self.fields.get("author")
+        items = value if isinstance(value, list) else [value]
+        names = []
+        for item in items:
+            if isinstance(item, dict):
+                item = item.get("name")
+            if isinstance(item, str) and item.strip():
+                names.append(item.strip())
+        return names
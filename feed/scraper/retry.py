@@ -0,0 +1,87 @@
+import httpx
+import logging
+import random
+import time
+
+from feed.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(httpx.RequestError):
+    """Raised instead of fetching while a host's circuit is open"""
+
+
+class RetryPolicy:
+    """Jittered exponential backoff for transport errors and retryable statuses"""
+
+    def __init__(self, attempts: int = 3, base_delay: float = 0.5, max_delay: float = 15.0):
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def is_retryable(self, status: int) -> bool:
+        return status in RETRYABLE_STATUSES
+
+    def delay(self, attempt: int, retry_after: float = None) -> float:
+        # Full jitter keeps retries from many workers from lining up
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after is not None:
+            backoff = max(backoff, min(retry_after, self.max_delay))
+        return backoff
+
+
+class CircuitBreaker:
+    """Stops sending requests to a host after repeated failures.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    every request to the host fails fast for ``cooldown`` seconds. After
+    that the circuit is half-open: exactly one request goes through as a
+    trial while the others keep failing fast. Its success closes the
+    circuit, its failure opens it again straight away. A trial that never
+    reports back (``release_trial`` not called either) expires after
+    another cooldown.
+    """
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = {}
+        self.opened_until = {}
+        # Host -> when its half-open trial request was let through
+        self.trials = {}
+
+    def check(self, host: str) -> bool:
+        """Raise CircuitOpenError unless the request may go, True when it goes as the trial"""
+        opened_until = self.opened_until.get(host)
+        if opened_until is None:
+            return False
+
+        now = time.monotonic()
+        trial = self.trials.get(host)
+        if now < opened_until or (trial is not None and now < trial + self.cooldown):
+            metrics.incr("circuit_short_circuits")
+            raise CircuitOpenError(f"Circuit open for {host}")
+        self.trials[host] = now
+        return True
+
+    def release_trial(self, host: str):
+        """Let another trial through, the current one ended without a verdict"""
+        self.trials.pop(host, None)
+
+    def record_success(self, host: str):
+        self.failures.pop(host, None)
+        self.opened_until.pop(host, None)
+        self.trials.pop(host, None)
+
+    def record_failure(self, host: str):
+        self.trials.pop(host, None)
+        failures = self.failures.get(host, 0) + 1
+        self.failures[host] = failures
+        if failures >= self.failure_threshold:
+            if host not in self.opened_until or time.monotonic() >= self.opened_until[host]:
+                logger.warning(f"Opening circuit for {host} after {failures} consecutive failures")
+                metrics.incr("circuits_opened")
+            self.opened_until[host] = time.monotonic() + self.cooldown
@@ -1,23 +1,29 @@
 import feedparser
 from datetime import datetime
 import asyncio
-import aiohttp
+
+from feed.scraper.http_client import ScraperHttpClient
+from feed.scraper.urls import canonicalize_url
 
 
 class RssScraper:
     def __init__(self, feed_url:str, source_name: str):
-        self.feed_url = feed_url
+        self.feed_url = canonicalize_url(feed_url)
         self.source_name = source_name
 
-    # This uses async(aiohttp) to get the raw xml text because feedparser doesn't support async.
+    # This uses the shared async client to get the raw xml text because feedparser doesn't support async.
 
-    async def fetch_feed_text(self, session: aiohttp.ClientSession) -> str:
-        async with session.get(self.feed_url, timeout=10, allow_redirects=True) as resp:
-            resp.raise_for_status()
-            return await resp.text()
+    async def fetch_feed_text(self, client: ScraperHttpClient) -> str | None:
+        resp = await client.get_if_modified(self.feed_url, timeout=10)
+        if resp is None:
+            return None  # 304, nothing new since the last poll
+        resp.raise_for_status()
+        return resp.text
 
-    async def fetch_articles(self, session: aiohttp.ClientSession, limit: int = None):
-        raw_feed = await self.fetch_feed_text(session)
+    async def fetch_articles(self, client: ScraperHttpClient, limit: int = None):
+        raw_feed = await self.fetch_feed_text(client)
+        if raw_feed is None:
+            return []
         feed = feedparser.parse(raw_feed)
 
         articles = []
@@ -49,7 +55,7 @@ class RssScraper:
             articles.append({
                 "source": self.source_name,
                 "title": entry.get("title", ""),
-                "link": entry.get("link", ""),
+                "link": canonicalize_url(entry.get("link", "")),
                 "published": published,
             })
         return articles
\ No newline at end of file
@@ -1,54 +1,196 @@
-from datetime import datetime
+from datetime import datetime, timezone
 import xml.etree.ElementTree as ET
-import httpx
 import asyncio
 import logging
+import zlib
+
+from feed.scraper.http_client import ScraperHttpClient
+from feed.scraper.urls import canonicalize_url
+
+SITEMAP_NS = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+NEWS_NS = '{http://www.google.com/schemas/sitemap-news/0.9}'
+OLDEST = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def parse_lastmod(value: str | None):
+    """Sitemap dates are W3C datetimes, compare them as aware UTC datetimes"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip())
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
 
 class SitemapScraper:
-    def __init__(self, feed_url:str):
-        self.feed_url = feed_url
-        self.namespace = {
-            'ns': 'http://www.sitemaps.org/schemas/sitemap/0.9',
-            'image': 'http://www.google.com/schemas/sitemap-image/1.1'
-        }
+    """Streams a sitemap (or sitemap index) and returns the URLs added since the last run.
+
+    The body is fed to an incremental XML parser chunk by chunk, so memory
+    stays flat whatever the sitemap size. Index files are followed
+    concurrently. When the client has a FeedStateStore, every sitemap keeps
+    a lastmod high-water mark and only URLs at or above it are returned,
+    with ``known_links`` dropping those already stored.
+
+    With a limit the newest URLs go first (oldest first with
+    ``newest_first=False``) and a mark never moves past a URL that was cut,
+    so the backlog stays eligible for later runs instead of being skipped.
+    The sitemaps still holding part of it lose their validators, otherwise
+    the next run would get a 304 and never see the rest.
+    """
+
+    def __init__(self, feed_url:str, client: ScraperHttpClient = None, max_depth: int = 3,
+                 known_links=None, newest_first: bool = True):
+        self.feed_url = canonicalize_url(feed_url)
+        self.client = client
+        self.max_depth = max_depth
+        self.known_links = known_links
+        self.newest_first = newest_first
+        self.parents = {}
 
     async def fetch_articles_async(self, limit: int = None):
+        if self.client is None:
+            async with ScraperHttpClient() as client:
+                return await self.collect_new_articles(client, limit)
+        return await self.collect_new_articles(self.client, limit)
+
+    async def collect_new_articles(self, client: ScraperHttpClient, limit: int = None) -> list:
+        self.parents = {}
+        articles, known = await self.crawl_sitemap(client, self.feed_url), []
+        if self.known_links is not None:
+            # Entries at the mark come back every run, stored ones are dropped quietly
+            known = [entry for entry in articles if entry["link"] in self.known_links]
+            articles = [entry for entry in articles if entry["link"] not in self.known_links]
+
+        if self.newest_first:
+            # Undated entries last, they can't be ranked
+            articles.sort(key=lambda entry: entry["lastmod"] or OLDEST, reverse=True)
+        else:
+            articles.sort(key=lambda entry: (entry["lastmod"] is None, entry["lastmod"] or OLDEST))
+
+        dropped = []
+        if limit and len(articles) > limit:
+            articles, dropped = articles[:limit], articles[limit:]
+            if client.feed_state is not None:
+                for url in self.lineage(entry["sitemap"] for entry in dropped):
+                    client.feed_state.forget_validators(url)
+
+        if client.feed_state is not None:
+            self.advance_watermarks(client.feed_state, articles + known, dropped)
+
+        return [{"link": entry["link"], "published": entry["published"]} for entry in articles]
+
+    def advance_watermarks(self, feed_state, done: list, dropped: list):
+        """Move each sitemap's mark up to its newest handled entry, never past one that was cut"""
+        ceilings = {}
+        for entry in dropped:
+            sitemap, lastmod = entry["sitemap"], entry["lastmod"]
+            if lastmod is not None and (sitemap not in ceilings or lastmod < ceilings[sitemap]):
+                ceilings[sitemap] = lastmod
+
+        marks = {}
+        for entry in done:
+            sitemap, lastmod = entry["sitemap"], entry["lastmod"]
+            if lastmod is not None and (sitemap not in marks or lastmod > marks[sitemap]):
+                marks[sitemap] = lastmod
+
+        for sitemap, mark in marks.items():
+            # The mark is inclusive, cut entries at the ceiling stay eligible
+            feed_state.advance_watermark(sitemap, min(mark, ceilings.get(sitemap, mark)))
+
+    def lineage(self, sitemaps) -> set:
+        """The given sitemaps and every index file that leads to them"""
+        urls = set()
+        for url in sitemaps:
+            while url is not None and url not in urls:
+                urls.add(url)
+                url = self.parents.get(url)
+        return urls
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-
-                response = await client.get(self.feed_url)
-                response.raise_for_status()
-                xml_content = response.text
-            except Exception as e:
-                logging.error(f"Failed to fetch sitemap {self.feed_url}: {e}")
-                return []
-
-        def parse_sitemap():
-            try: 
-                root = ET.fromstring(xml_content)
-                articles = []
-
-                for url in root.findall('ns:url', self.namespace):
-                    loc = url.find('ns:loc', self.namespace)
-                    lastmod = url.find('ns:lastmod', self.namespace)
-
-                    if loc is not None:
-                        articles.append({
-                            "link": loc.text,
-                            "published": lastmod.text if lastmod is not None else None
-                        })
-
-                return articles[:limit] if limit else articles
-            
-            except ET.ParseError as e:
-                logging.error(f"Failed to parse sitemap XML: {e}")
-                return []
-            
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, parse_sitemap)
-    
     def fetch_articles(self, limit: int = None):
         return asyncio.run(self.fetch_articles_async(limit))
 
-            
+    async def crawl_sitemap(self, client: ScraperHttpClient, url: str, depth: int = 0) -> list:
+        feed_state = client.feed_state
+        watermark = feed_state.watermark(url) if feed_state is not None else None
+
+        try:
+            urls, child_sitemaps = await self.stream_sitemap(client, url)
+        except Exception as e:
+            logging.error(f"Failed to fetch sitemap {url}: {e}")
+            return []
+
+        if urls is None:
+            logging.info(f"Sitemap {url} not modified since last run")
+            return []
+
+        # Entries without a lastmod can't be compared and are always kept.
+        # Entries at the mark are kept too, a limit may have cut some of them.
+        articles = [dict(entry, sitemap=url) for entry in urls
+                    if watermark is None or entry["lastmod"] is None or entry["lastmod"] >= watermark]
+
+        if child_sitemaps and depth < self.max_depth:
+            children = [
+                child["link"] for child in child_sitemaps
+                if feed_state is None or child["lastmod"] is None
+                or feed_state.watermark(child["link"]) is None
+                or child["lastmod"] >= feed_state.watermark(child["link"])
+            ]
+            for child in children:
+                self.parents[child] = url
+            results = await asyncio.gather(
+                *(self.crawl_sitemap(client, child, depth + 1) for child in children)
+            )
+            for child_articles in results:
+                articles.extend(child_articles)
+
+        return articles
+
+    async def stream_sitemap(self, client: ScraperHttpClient, url: str):
+        """Return (urls, child sitemaps) parsed from the streamed body, (None, None) on 304"""
+        parser = ET.XMLPullParser(events=("start", "end"))
+        urls, sitemaps = [], []
+        root = None
+        # .xml.gz files are gzip on the wire without a Content-Encoding header
+        gunzip = zlib.decompressobj(16 + zlib.MAX_WBITS) if url.endswith(".gz") else None
+
+        async with client.stream_if_modified(url) as response:
+            if response is None:
+                return None, None
+            response.raise_for_status()
+
+            async for chunk in response.aiter_bytes():
+                parser.feed(gunzip.decompress(chunk) if gunzip else chunk)
+                root = self.drain_events(parser, root, urls, sitemaps)
+
+        parser.close()
+        self.drain_events(parser, root, urls, sitemaps)
+        return urls, sitemaps
+
+    def drain_events(self, parser, root, urls: list, sitemaps: list):
+        for event, elem in parser.read_events():
+            if event == "start":
+                if root is None:
+                    root = elem
+                continue
+
+            if elem.tag not in (f"{SITEMAP_NS}url", f"{SITEMAP_NS}sitemap"):
+                continue
+
+            loc = elem.findtext(f"{SITEMAP_NS}loc")
+            if loc:
+                lastmod_text = (elem.findtext(f"{SITEMAP_NS}lastmod")
+                                or elem.findtext(f"{NEWS_NS}news/{NEWS_NS}publication_date"))
+                entry = {
+                    "link": canonicalize_url(loc),
+                    "published": lastmod_text,
+                    "lastmod": parse_lastmod(lastmod_text),
+                }
+                (urls if elem.tag == f"{SITEMAP_NS}url" else sitemaps).append(entry)
+
+            # Drop finished entries so the tree never holds the whole document
+            root.clear()
+
+        return root
@@ -0,0 +1,67 @@
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+# Query parameters that only track the click, never select content
+TRACKING_PARAMS = {
+    "_ga", "_gl", "cmpid", "cmp", "dclid", "fbclid", "gclid", "gclsrc", "guccounter", "guce_referrer",
+    "guce_referrer_sig", "igshid", "itm_campaign", "itm_medium", "itm_source", "mc_cid", "mc_eid",
+    "mkt_tok", "msclkid", "ncid", "ocid", "ref", "ref_src", "ref_url", "smid", "sr_share", "taid",
+    "twclid", "yclid", "__twitter_impression",
+}
+TRACKING_PREFIXES = ("utm_", "itm_", "pk_", "mtm_")
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def canonicalize_url(url: str, base: str = None, prefer_https: bool = True) -> str:
+    """One spelling per page, used for dedup, fetching and storage.
+
+    Resolves against ``base``, upgrades http to https, lowercases the host,
+    drops default ports, the fragment, tracking parameters and a trailing
+    slash, and sorts what is left of the query. Anything that isn't an
+    http(s) URL is returned stripped but otherwise untouched.
+    """
+    if not url:
+        return url
+    url = url.strip()
+    if base:
+        url = urljoin(base, url)
+
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return url
+    if port == DEFAULT_PORTS[scheme]:
+        port = None
+    # A custom port is tied to its scheme, only plain http is upgraded
+    if prefer_https and scheme == "http" and port is None:
+        scheme = "https"
+
+    host = parts.hostname.rstrip(".")
+    if ":" in host:
+        # IPv6 literal, hostname comes back without its brackets
+        host = f"[{host}]"
+    if port:
+        host = f"{host}:{port}"
+    if parts.username or parts.password:
+        host = f"{parts.username or ''}{':' + parts.password if parts.password else ''}@{host}"
+
+    path = parts.path or "/"
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/") or "/"
+
+    query = urlencode(sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not is_tracking_param(name)
+    ))
+
+    return urlunsplit((scheme, host, path, query, ""))
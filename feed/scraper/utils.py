@@ -1,6 +1,8 @@
-import json
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Union
+import importlib
+import json
 
 def build_api_params(raw_params: dict) -> dict:
     # Deep copy the dict so we don’t mutate the config file
@@ -15,4 +17,14 @@ def load_config(path: Union[str, Path]) -> Any:
         raise FileNotFoundError(f"Config file not found: {config_path}")
     
     with config_path.open("r", encoding="utf-8") as f:
-        return json.load(f)
\ No newline at end of file
+        return json.load(f)
+
+
+@lru_cache(maxsize=None)
+def module_available(name: str) -> bool:
+    """Whether an optional dependency (h2, zstandard, ahocorasick...) can be imported"""
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        return False
+    return True
@@ -5,7 +5,7 @@ def test_static():
     scraper = api_scraper.BackendApiScraper(
         url="https://thenextweb.com/deep-tech", 
         source="the_next_web",
-        categories=[], 
+        base_url="https://thenextweb.com/",
         selectors={
             "container":"main.c-split__main",
             "articles": "article a"
@@ -1,29 +1,48 @@
-from django.utils.dateparse import parse_datetime
-from datetime import datetime
 from feed.scraper.article_scraper import ArticleScraper
-import json
+from feed.scraper.http_client import ScraperHttpClient
+from feed.scraper.extraction import ExtractorRouter
+from feed.scraper.archive import PageArchive
+from feed.services.link_index import KnownLinkIndex
+from feed.services.ingest_pipeline import ArticleWriter
+from feed.metrics import metrics
 import asyncio
 import logging
 
-def normalize_published(raw):
-    if isinstance(raw, datetime):
-        return raw.date()
-    if isinstance(raw, str):
-        parsed = parse_datetime(raw)
-        return parsed.date() if parsed else None
-    return None
-   
-async def process_articles(entries: list, site: dict, from_dicts: bool = True) -> list[dict]:
+
+async def process_articles(entries: list, site: dict, from_dicts: bool = True,
+                           client: ScraperHttpClient = None,
+                           known_links: KnownLinkIndex = None,
+                           writer: ArticleWriter = None,
+                           router: ExtractorRouter = None,
+                           archive: PageArchive = None) -> list[dict]:
+
+    # Already stored links are skipped before any page is fetched
+    if entries and known_links is not None:
+        entries = known_links.filter_new(entries, from_dicts, source=site["name"])
 
     if not entries:
         return []
 
+    with metrics.timer("process_articles"):
+        return await _process_entries(entries, site, from_dicts, client, writer, router, archive)
+
+
+async def _process_entries(entries: list, site: dict, from_dicts: bool,
+                           client: ScraperHttpClient, writer: ArticleWriter,
+                           router: ExtractorRouter, archive: PageArchive) -> list[dict]:
+
     semaphore = asyncio.Semaphore(10)
 
     async def scrape_with_limit(entry):
         async with semaphore:
             link = entry["link"] if from_dicts else entry
-            return await scrape_article(link, site)
+            article = await scrape_article(link, site, client, router, archive)
+
+            # Hand each article to the writer while still holding the scrape
+            # slot, so a full queue stops new fetches until the writer catches up
+            if article and writer is not None:
+                await writer.put(article)
+        return article
         
     tasks = [scrape_with_limit(entry) for entry in entries]
     results = await asyncio.gather(*tasks, return_exceptions=True)
@@ -37,15 +56,29 @@ async def process_articles(entries: list, site: dict, from_dicts: bool = True) -
 
     return successful_results
 
-async def scrape_article(link: str, site: dict) -> dict | None:
+async def scrape_article(link: str, site: dict, client: ScraperHttpClient = None,
+                         router: ExtractorRouter = None, archive: PageArchive = None) -> dict | None:
     
+    source = site["name"]
     try:
-        async with ArticleScraper(link) as scraper:
-            result = await scraper.extract_comprehensive()
+        async with ArticleScraper(link, client, archive=archive, source=source) as scraper:
+            result = await scraper.extract_comprehensive(router, site)
+            if scraper.fetched:
+                metrics.incr("fetched", source=source)
+                metrics.incr("page_bytes", scraper.bytes_downloaded, source=source)
+            elif scraper.fetch_error:
+                metrics.record_error(scraper.fetch_error, source)
 
             if not result or not result.get("title"):
+                if not scraper.fetched and not scraper.fetch_error:
+                    # The client refused the claim: a repeat link of this run,
+                    # or in daemon mode one still waiting to be saved
+                    metrics.incr("skipped", source=source)
+                else:
+                    metrics.incr("failed", source=source)
                 return None
-            
+
+            metrics.incr("extracted", source=source)
             return {
                 "source": site["name"],
                 "title": result["title"],
@@ -56,4 +89,6 @@ async def scrape_article(link: str, site: dict) -> dict | None:
     
     except Exception as e:
         logging.error(f"Failed to scrape {link}: {e}")
+        metrics.incr("failed", source=source)
+        metrics.record_error(e, source)
         return None
\ No newline at end of file
@@ -0,0 +1,121 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date
+from django.core.cache import cache
+from django.db.models import Q
+from feed.models import NewsArticleModel
+import hashlib
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+MAX_LIMIT = 100
+CACHE_TIMEOUT = 300
+_VERSION_KEY = "articles:version"
+
+# Everything a list row shows, full_content is only loaded by the detail view
+LIST_FIELDS = ("id", "source", "title", "link", "published")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(published: date, article_id: int) -> str:
+    return urlsafe_b64encode(f"{published.isoformat()}|{article_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[date, int]:
+    try:
+        raw = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        published, article_id = raw.split("|")
+        return date.fromisoformat(published), int(article_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+def list_articles(source: str = None, since: date = None, until: date = None, symbol: str = None,
+                  cursor: str = None, limit: int = 20) -> dict:
+    """Newest articles first, one keyset page at a time.
+
+    The cursor is the (published, id) of the last row of the previous page,
+    so every page is an index range scan no matter how deep it is.
+    """
+    limit = max(1, min(limit, MAX_LIMIT))
+    queryset = NewsArticleModel.objects.only(*LIST_FIELDS)
+
+    if source:
+        queryset = queryset.filter(source=source)
+    if since:
+        queryset = queryset.filter(published__gte=since)
+    if until:
+        queryset = queryset.filter(published__lte=until)
+    if symbol:
+        queryset = queryset.filter(entities__symbol=symbol.upper())
+    if cursor:
+        published, article_id = decode_cursor(cursor)
+        queryset = queryset.filter(Q(published__lt=published) | Q(published=published, id__lt=article_id))
+
+    rows = list(queryset.order_by("-published", "-id")[:limit + 1])
+    page = rows[:limit]
+    return {
+        "results": [_list_row(article) for article in page],
+        "next_cursor": encode_cursor(page[-1].published, page[-1].id) if len(rows) > limit else None,
+        "limit": limit,
+    }
+
+
+def get_article(article_id: int) -> dict | None:
+    article = (
+        NewsArticleModel.objects
+        .filter(id=article_id)
+        .defer("fingerprint")
+        .prefetch_related("entities")
+        .first()
+    )
+    if article is None:
+        return None
+    return {
+        **_list_row(article),
+        "full_content": article.full_content,
+        "symbols": sorted(entity.symbol for entity in article.entities.all()),
+        "duplicates": article.duplicates.count(),
+    }
+
+
+def _list_row(article: NewsArticleModel) -> dict:
+    return {field: getattr(article, field) for field in LIST_FIELDS}
+
+
+# Response cache. Every key carries the current articles version, saving
+# articles replaces the version and so retires all cached pages at once.
+# Versions are nanosecond timestamps rather than a counter: a lost or
+# expired version key must never bring back a number old pages are cached
+# under. cache.incr is no use either, on most backends it rewrites the key
+# with the default timeout.
+
+def articles_version() -> int:
+    version = cache.get(_VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        # Another process may have stored one first, theirs wins
+        if not cache.add(_VERSION_KEY, version, timeout=None):
+            version = cache.get(_VERSION_KEY, version)
+    return version
+
+
+def invalidate_article_cache():
+    # Strictly increasing even when the clock ticks coarser than the saves
+    cache.set(_VERSION_KEY, max(time.time_ns(), articles_version() + 1), timeout=None)
+
+
+def cached(name: str, params: dict, build):
+    """``build()`` cached under ``name`` and the request parameters"""
+    digest = hashlib.md5(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+    key = f"articles:{articles_version()}:{name}:{digest}"
+    response = cache.get(key)
+    if response is None:
+        response = build()
+        cache.set(key, response, timeout=CACHE_TIMEOUT)
+    return response
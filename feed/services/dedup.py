@@ -0,0 +1,120 @@
+from asgiref.sync import sync_to_async
+from collections import defaultdict
+from django.db import transaction
+from feed.fingerprint import minhash, similarity, band_keys, to_bytes, from_bytes, SIMILARITY_THRESHOLD
+from feed.models import NewsArticleModel, ArticleFingerprintBand, DuplicateArticle
+from feed.metrics import metrics
+from feed.services.saving_to_db import normalize_published
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@sync_to_async
+def split_duplicates(articles: list, threshold: float = SIMILARITY_THRESHOLD) -> tuple[list, list]:
+    with metrics.timer("dedup"):
+        return _split_duplicates(articles, threshold)
+
+
+def _split_duplicates(articles: list, threshold: float = SIMILARITY_THRESHOLD) -> tuple[list, list]:
+    """Separate near-duplicates from the articles that should be stored.
+
+    Each article is fingerprinted and compared with the stored articles and
+    the earlier articles of the same batch that share an LSH band with it.
+    Unique articles come back with their ``fingerprint`` set, duplicates as
+    ``{"article", "canonical_link", "similarity"}``.
+    """
+    signed = []
+    for article in articles:
+        signature = minhash(article.get("full_content") or article.get("title"))
+        signed.append((article, signature, band_keys(signature) if signature else []))
+
+    # Stored candidates for every band key of the batch, in two queries
+    buckets = defaultdict(list)
+    keys = {key for _, _, article_keys in signed for key in article_keys}
+    if keys:
+        bands = list(ArticleFingerprintBand.objects.filter(key__in=keys).values_list("key", "article_id"))
+        stored = {
+            article_id: (link, from_bytes(fingerprint))
+            for article_id, link, fingerprint in NewsArticleModel.objects
+            .filter(id__in={article_id for _, article_id in bands}, fingerprint__isnull=False)
+            .values_list("id", "link", "fingerprint")
+        }
+        for key, article_id in bands:
+            if article_id in stored:
+                buckets[key].append(stored[article_id])
+
+    unique, duplicates = [], []
+    for article, signature, article_keys in signed:
+        if signature is None:
+            unique.append(article)
+            continue
+
+        best_link, best = None, 0.0
+        for key in article_keys:
+            for link, candidate in buckets[key]:
+                # A re-extracted article is not a duplicate of its own stored row
+                if link == article["link"]:
+                    continue
+                score = similarity(signature, candidate)
+                if score > best:
+                    best_link, best = link, score
+
+        if best >= threshold:
+            duplicates.append({"article": article, "canonical_link": best_link, "similarity": best})
+            metrics.incr("near_duplicates", source=article.get("source"))
+            continue
+
+        article["fingerprint"] = to_bytes(signature)
+        unique.append(article)
+        for key in article_keys:
+            buckets[key].append((article["link"], signature))
+
+    return unique, duplicates
+
+
+@sync_to_async
+def store_fingerprints(saved: list, duplicates: list, replace: bool = False):
+    with metrics.timer("dedup"):
+        _store_fingerprints(saved, duplicates, replace)
+
+
+def _store_fingerprints(saved: list, duplicates: list, replace: bool = False):
+    """Index the band keys of saved articles and record duplicates against their canonical article"""
+    bands = [
+        ArticleFingerprintBand(article=article, key=key)
+        for article in saved if article.fingerprint
+        for key in band_keys(from_bytes(article.fingerprint))
+    ]
+
+    canonical = {}
+    if duplicates:
+        canonical = dict(
+            NewsArticleModel.objects
+            .filter(link__in={duplicate["canonical_link"] for duplicate in duplicates})
+            .values_list("link", "id")
+        )
+
+    records = []
+    for duplicate in duplicates:
+        canonical_id = canonical.get(duplicate["canonical_link"])
+        if canonical_id is None:
+            # The canonical article of the same batch failed to save
+            continue
+        article = duplicate["article"]
+        records.append(DuplicateArticle(
+            canonical_id=canonical_id,
+            source=article.get("source", ""),
+            title=(article.get("title") or "")[:300],
+            link=article["link"],
+            # Extractors hand over datetimes and ISO strings, one bad value
+            # must not roll back the band rows of the whole batch
+            published=normalize_published(article.get("published")),
+            similarity=duplicate["similarity"],
+        ))
+
+    with transaction.atomic():
+        if replace:
+            ArticleFingerprintBand.objects.filter(article__in=[article.pk for article in saved]).delete()
+        ArticleFingerprintBand.objects.bulk_create(bands, batch_size=1000)
+        DuplicateArticle.objects.bulk_create(records, ignore_conflicts=True)
@@ -0,0 +1,45 @@
+from asgiref.sync import sync_to_async
+from datetime import date
+from django.db import transaction
+from feed.entities import EntityMatcher
+from feed.models import ArticleEntity, NewsArticleModel
+from feed.metrics import metrics
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@sync_to_async
+def index_entities(articles: list, matcher: EntityMatcher, replace: bool = False) -> int:
+    with metrics.timer("entity_index"):
+        return _index_entities(articles, matcher, replace)
+
+
+def _index_entities(articles: list, matcher: EntityMatcher, replace: bool = False) -> int:
+    """Store the symbols each saved article mentions.
+
+    With ``replace`` the articles' existing tags are dropped first, for
+    re-extracted articles and dictionary changes.
+    """
+    rows = []
+    for article in articles:
+        for symbol, mentions in matcher.match(article.title, article.full_content).items():
+            rows.append(ArticleEntity(article=article, symbol=symbol, mentions=mentions,
+                                      published=article.published))
+
+    with transaction.atomic():
+        if replace:
+            ArticleEntity.objects.filter(article__in=[article.pk for article in articles]).delete()
+        ArticleEntity.objects.bulk_create(rows, ignore_conflicts=True, batch_size=1000)
+
+    metrics.incr("entities_tagged", len(rows))
+    return len(rows)
+
+
+def articles_for_symbol(symbol: str, since: date):
+    """Articles mentioning ``symbol`` published on or after ``since``, newest first"""
+    return (
+        NewsArticleModel.objects
+        .filter(entities__symbol=symbol.upper(), entities__published__gte=since)
+        .order_by("-published", "-id")
+    )
@@ -0,0 +1,47 @@
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+from feed.models import ExtractorStat
+from feed.scraper.extraction import ExtractorRouter
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@sync_to_async
+def load_router(**kwargs) -> ExtractorRouter:
+    stats = {
+        (stat.source, stat.extractor): {
+            "attempts": stat.attempts,
+            "fields": stat.fields_supplied,
+            "complete": stat.complete,
+        }
+        for stat in ExtractorStat.objects.all()
+    }
+    return ExtractorRouter(stats, **kwargs)
+
+
+@sync_to_async
+def save_router(router: ExtractorRouter):
+    """Upsert the stats that changed during the run"""
+    if not router.dirty:
+        return
+
+    now = timezone.now()
+    ExtractorStat.objects.bulk_create(
+        [
+            ExtractorStat(
+                source=source,
+                extractor=stage,
+                attempts=router.stats[(source, stage)]["attempts"],
+                fields_supplied=router.stats[(source, stage)]["fields"],
+                complete=router.stats[(source, stage)]["complete"],
+                updated_at=now,
+            )
+            for source, stage in router.dirty
+        ],
+        update_conflicts=True,
+        unique_fields=["source", "extractor"],
+        update_fields=["attempts", "fields_supplied", "complete", "updated_at"],
+    )
+    logger.info(f"Saved extractor stats for {len(router.dirty)} source/extractor pairs")
+    router.dirty.clear()
@@ -0,0 +1,91 @@
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+from feed.models import FeedState
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class FeedStateStore:
+    """HTTP validators (ETag / Last-Modified) for every polled URL.
+
+    Loaded once per run, updated in memory as responses come in and written
+    back in bulk at the end of the run.
+    """
+
+    def __init__(self, states: dict = None):
+        self.states = states or {}
+        self.dirty = set()
+
+    @classmethod
+    @sync_to_async
+    def load(cls) -> "FeedStateStore":
+        return cls({state.url: state for state in FeedState.objects.all()})
+
+    def get(self, url: str) -> FeedState:
+        state = self.states.get(url)
+        if state is None:
+            state = FeedState(url=url)
+            self.states[url] = state
+        return state
+
+    def conditional_headers(self, url: str) -> dict:
+        state = self.states.get(url)
+        headers = {}
+        if state is not None:
+            if state.etag:
+                headers["If-None-Match"] = state.etag
+            if state.last_modified:
+                headers["If-Modified-Since"] = state.last_modified
+        return headers
+
+    def watermark(self, url: str):
+        state = self.states.get(url)
+        return state.watermark if state is not None else None
+
+    def advance_watermark(self, url: str, value):
+        state = self.get(url)
+        if value is not None and (state.watermark is None or value > state.watermark):
+            state.watermark = value
+            self.dirty.add(url)
+
+    def poll_interval(self, url: str):
+        state = self.states.get(url)
+        return state.poll_interval if state is not None else None
+
+    def set_poll_interval(self, url: str, seconds: float):
+        self.get(url).poll_interval = seconds
+        self.dirty.add(url)
+
+    def record_response(self, url: str, response):
+        state = self.get(url)
+        if response.status_code != 304:
+            state.etag = response.headers.get("ETag", "")
+            state.last_modified = response.headers.get("Last-Modified", "")
+        state.checked_at = timezone.now()
+        self.dirty.add(url)
+
+    def forget_validators(self, url: str):
+        """Make the next request for ``url`` unconditional"""
+        state = self.states.get(url)
+        if state is not None and (state.etag or state.last_modified):
+            state.etag = ""
+            state.last_modified = ""
+            self.dirty.add(url)
+
+    @sync_to_async
+    def save(self):
+        if not self.dirty:
+            return
+        states = [self.states[url] for url in self.dirty]
+        fields = ["etag", "last_modified", "checked_at", "watermark", "poll_interval"]
+
+        FeedState.objects.bulk_update([state for state in states if state.pk], fields)
+        FeedState.objects.bulk_create(
+            [state for state in states if not state.pk],
+            update_conflicts=True,
+            unique_fields=["url"],
+            update_fields=fields,
+        )
+        logger.info(f"Saved polling state for {len(self.dirty)} URLs")
+        self.dirty.clear()
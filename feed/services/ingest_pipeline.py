@@ -0,0 +1,85 @@
+import asyncio
+import logging
+
+from feed.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class ArticleWriter:
+    """Bounded queue between the scrapers and the database.
+
+    Scrapers ``put`` articles as soon as they are extracted and a single
+    writer task drains the queue, flushing when ``batch_size`` articles are
+    waiting or ``flush_interval`` seconds after the first one arrived. When
+    the database falls behind the queue fills up and ``put`` blocks, which
+    slows the fetchers down instead of buffering without limit.
+    """
+
+    def __init__(self, save_func, batch_size: int = 50, flush_interval: float = 2.0, max_queue: int = 200):
+        self.save_func = save_func
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.task = None
+        self.flushed = 0
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    async def put(self, article: dict):
+        await self.queue.put(article)
+
+    async def close(self):
+        """Flush what is left and wait for the writer to finish"""
+        if self.task is None:
+            return
+        await self.queue.put(_STOP)
+        await self.task
+        self.task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        batch = []
+        deadline = None
+
+        while True:
+            timeout = max(0, deadline - loop.time()) if batch else None
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                await self._flush(batch)
+                batch = []
+                continue
+
+            if item is _STOP:
+                await self._flush(batch)
+                return
+
+            if not batch:
+                deadline = loop.time() + self.flush_interval
+            batch.append(item)
+
+            if len(batch) >= self.batch_size:
+                await self._flush(batch)
+                batch = []
+
+    async def _flush(self, batch: list):
+        if not batch:
+            return
+        try:
+            with metrics.timer("db_save"):
+                await self.save_func(batch)
+            self.flushed += len(batch)
+        except Exception as e:
+            logger.error(f"Writer failed to save batch of {len(batch)} articles: {e}")
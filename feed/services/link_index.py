@@ -0,0 +1,53 @@
+from asgiref.sync import sync_to_async
+from feed.models import NewsArticleModel, DuplicateArticle
+from itertools import chain
+from feed.metrics import metrics
+from feed.scraper.urls import canonicalize_url
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class KnownLinkIndex:
+    """Links already stored in NewsArticleModel.
+
+    Loaded with one query at the start of a run so entries we already have
+    are dropped before any article page is fetched or extracted.
+    """
+
+    def __init__(self, links=None):
+        # Rows stored before links were canonicalized still match their new spelling
+        self.links = {canonicalize_url(link) for link in links or ()}
+
+    @classmethod
+    @sync_to_async
+    def load(cls) -> "KnownLinkIndex":
+        # Links recorded as near-duplicates are not worth fetching again either
+        links = chain(
+            NewsArticleModel.objects.values_list("link", flat=True).iterator(chunk_size=5000),
+            DuplicateArticle.objects.values_list("link", flat=True).iterator(chunk_size=5000),
+        )
+        index = cls(links)
+        logger.info(f"Loaded {len(index)} known links")
+        return index
+
+    def __contains__(self, link) -> bool:
+        return link in self.links
+
+    def __len__(self) -> int:
+        return len(self.links)
+
+    def add(self, link: str):
+        self.links.add(canonicalize_url(link))
+
+    def filter_new(self, entries: list, from_dicts: bool = True, source: str = None) -> list:
+        """Drop entries whose link is already stored"""
+        new_entries = []
+        for entry in entries:
+            link = entry.get("link") if from_dicts else entry
+            if link in self.links:
+                metrics.incr("known_links_skipped")
+                metrics.incr("skipped", source=source)
+                continue
+            new_entries.append(entry)
+        return new_entries
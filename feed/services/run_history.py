@@ -0,0 +1,56 @@
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from feed.models import ScrapeRun, ScrapeItem
+from feed.metrics import RunMetrics
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@sync_to_async
+def record_run(run_metrics: RunMetrics, started_at, finished_at, site_outcomes: dict) -> ScrapeRun:
+    """Persist a finished run and one ScrapeItem per site in a single transaction.
+
+    ``site_outcomes`` maps a site name to ``{"duration": seconds, "succeeded": bool}``.
+    """
+    counters = run_metrics.counters
+
+    with transaction.atomic():
+        run = ScrapeRun.objects.create(
+            started_at=started_at,
+            finished_at=finished_at,
+            duration=(finished_at - started_at).total_seconds(),
+            sites_total=len(site_outcomes),
+            sites_succeeded=sum(1 for outcome in site_outcomes.values() if outcome["succeeded"]),
+            network_fetches=counters["network_fetches"],
+            articles_fetched=counters["fetched"],
+            articles_skipped=counters["skipped"],
+            articles_extracted=counters["extracted"],
+            articles_saved=counters["saved"],
+            articles_created=counters["created"],
+            articles_failed=counters["failed"] + counters["save_failed"],
+            bytes_downloaded=counters["bytes_downloaded"],
+            error_classes=run_metrics.error_classes(),
+        )
+
+        items = []
+        for source, outcome in site_outcomes.items():
+            counts = run_metrics.sources.get(source, {})
+            items.append(ScrapeItem(
+                run=run,
+                source=source,
+                duration=outcome["duration"],
+                succeeded=outcome["succeeded"],
+                fetched=counts.get("fetched", 0),
+                skipped=counts.get("skipped", 0),
+                extracted=counts.get("extracted", 0),
+                saved=counts.get("saved", 0),
+                created=counts.get("created", 0),
+                failed=counts.get("failed", 0) + counts.get("save_failed", 0),
+                bytes_downloaded=counts.get("page_bytes", 0),
+                error_classes=run_metrics.error_classes(source),
+            ))
+        ScrapeItem.objects.bulk_create(items)
+
+    logger.info(f"Recorded run {run.pk} with {len(items)} sites")
+    return run
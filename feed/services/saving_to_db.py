@@ -1,43 +1,196 @@
 from feed.models import NewsArticleModel
+from feed.metrics import metrics
+from feed.services.article_queries import invalidate_article_cache
+from django.db import transaction
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import date, datetime
 import logging
-import asyncio
 from asgiref.sync import sync_to_async
 
 logger = logging.getLogger(__name__)
 
+OVERWRITE_FIELDS = ["source", "title", "published", "full_content", "fingerprint"]
+
+
+def normalize_published(value) -> date | None:
+    """The article's publication day, whatever shape the extractor returned it in"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        value = value.strip()
+        try:
+            parsed = parse_datetime(value)
+            if parsed:
+                return parsed.date()
+            return parse_date(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _clean(article: dict) -> tuple[dict | None, str | None]:
+    """The article ready to store, or the reason it can't be"""
+    if not article.get("link"):
+        return None, "Missing link"
+    published = normalize_published(article.get("published"))
+    if published is None:
+        return None, f"Invalid published date: {article.get('published')!r}"
+    return {**article, "published": published}, None
+
+
+def _save_row(article: dict, overwrite: bool = False) -> tuple[NewsArticleModel, bool]:
+    defaults = {k: v for k, v in article.items() if k != "link"}
+    if overwrite:
+        return NewsArticleModel.objects.update_or_create(link=article["link"], defaults=defaults)
+    return NewsArticleModel.objects.get_or_create(link=article["link"], defaults=defaults)
+
+
+@sync_to_async
+def save_articles(data: list) -> dict:
+    with metrics.timer("save_articles"):
+        return _save_articles(data)
+
+
+def _save_articles(data: list) -> dict:
+    results = {
+        'saved': [],
+        'failed': [],
+        'total_attempted': len(data)
+    }
+
+    for article in data:
+        cleaned, error = _clean(article)
+        if error:
+            results['failed'].append({
+                'data': article,
+                'error': error
+            })
+            continue
+        _save_rows([cleaned], results)
+
+    record_save_metrics(results)
+    # New rows change what the dashboard shows, retire its cached responses
+    if any(saved['created'] for saved in results['saved']):
+        invalidate_article_cache()
+    logger.info(f"Bulk save completed: {len(results['saved'])} saved, {len(results['failed'])} failed")
+    return results
+
 
 @sync_to_async
-def save_articles(data: list) -> NewsArticleModel | None:
+def save_articles_bulk(data: list, batch_size: int = 500, overwrite: bool = False) -> dict:
+    with metrics.timer("save_articles"):
+        return _save_articles_bulk(data, batch_size, overwrite)
+
+
+def _save_articles_bulk(data: list, batch_size: int, overwrite: bool = False) -> dict:
+    """Same accounting as save_articles but one bulk INSERT per batch.
+
+    Each batch runs in a single transaction: the links that already exist
+    are read first, the rest go through bulk_create(ignore_conflicts=True)
+    and the rows are read back to report what was created. With
+    ``overwrite`` existing rows are updated in place instead, which is how
+    a replay replaces older extractions. A batch the database rejects is
+    saved again row by row, so one bad article only costs itself.
+    """
     results = {
         'saved': [],
         'failed': [],
         'total_attempted': len(data)
     }
 
+    valid = []
     for article in data:
+        cleaned, error = _clean(article)
+        if error:
+            results['failed'].append({
+                'data': article,
+                'error': error
+            })
+            continue
+        valid.append(cleaned)
+
+    for start in range(0, len(valid), batch_size):
+        batch = valid[start:start + batch_size]
+        links = [article["link"] for article in batch]
+
         try:
-            if not article.get("link"):
+            with transaction.atomic():
+                existing = set(
+                    NewsArticleModel.objects.filter(link__in=links).values_list("link", flat=True)
+                )
+                if overwrite:
+                    # One row per link, a statement may not update the same row twice
+                    latest = {article["link"]: article for article in batch}
+                    NewsArticleModel.objects.bulk_create(
+                        [NewsArticleModel(**article) for article in latest.values()],
+                        update_conflicts=True,
+                        unique_fields=["link"],
+                        update_fields=OVERWRITE_FIELDS,
+                    )
+                else:
+                    NewsArticleModel.objects.bulk_create(
+                        [NewsArticleModel(**article) for article in batch if article["link"] not in existing],
+                        ignore_conflicts=True
+                    )
+                stored = {obj.link: obj for obj in NewsArticleModel.objects.filter(link__in=links)}
+        except Exception as e:
+            # One bad row fails the whole statement, retry the batch row by
+            # row so only that row is lost
+            logger.warning(f"Bulk save of {len(batch)} articles failed, saving them one by one — {e}")
+            metrics.incr("bulk_save_fallbacks")
+            _save_rows(batch, results, overwrite)
+            continue
+
+        seen = set()
+        for article in batch:
+            obj = stored.get(article["link"])
+            if obj is None:
+                # Skipped by ignore_conflicts, usually a duplicate title under another link
                 results['failed'].append({
                     'data': article,
-                    'error': "Missing link"
+                    'error': "Conflicts with an existing article"
                 })
                 continue
 
-            obj, created = NewsArticleModel.objects.get_or_create(
-                link=article["link"],
-                defaults={k: v for k, v in article.items() if k != "link"}
-            )
             results['saved'].append({
                 'object': obj,
-                'created': created
+                'created': article["link"] not in existing and article["link"] not in seen
             })
+            seen.add(article["link"])
 
+    record_save_metrics(results)
+    # Created or overwritten rows change what the dashboard shows, retire
+    # its cached responses. Links that were already stored change nothing.
+    if any(overwrite or saved['created'] for saved in results['saved']):
+        invalidate_article_cache()
+    logger.info(f"Bulk save completed: {len(results['saved'])} saved, {len(results['failed'])} failed")
+    return results
+
+
+def _save_rows(articles: list, results: dict, overwrite: bool = False):
+    for article in articles:
+        try:
+            # A savepoint per row, a failed row must not break an outer transaction
+            with transaction.atomic():
+                obj, created = _save_row(article, overwrite)
+            results['saved'].append({
+                'object': obj,
+                'created': created
+            })
         except Exception as e:
             logger.error(f"Failed to save article: {article.get('title', 'Unknown')} — {e}")
             results['failed'].append({
                 'data': article,
                 'error': str(e)
             })
-    
-    logger.info(f"Bulk save completed: {len(results['saved'])} saved, {len(results['failed'])} failed")
-    return results
+
+
+def record_save_metrics(results: dict):
+    for saved in results['saved']:
+        metrics.incr("saved", source=saved['object'].source)
+        if saved['created']:
+            metrics.incr("created", source=saved['object'].source)
+    for failed in results['failed']:
+        metrics.incr("save_failed", source=failed['data'].get("source"))
@@ -0,0 +1,111 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class FeedJob:
+    """One pollable unit: an RSS feed, a sitemap or a listing page"""
+
+    def __init__(self, site: dict, url: str, poll):
+        self.site = site
+        self.url = url
+        # Coroutine function returning the number of new articles found
+        self.poll = poll
+        self.interval = None
+
+    def __repr__(self):
+        return f"<FeedJob {self.site.get('name')} {self.url}>"
+
+
+class FeedScheduler:
+    """Polls every job on its own interval and adapts it to the feed's activity.
+
+    A poll that finds new articles halves the interval (down to
+    ``min_interval``), an empty poll stretches it by ``backoff`` (up to
+    ``max_interval``). Intervals are kept in the FeedStateStore so a restart
+    resumes with what was learned. ``on_flush``, when given, is awaited
+    right after every periodic state flush.
+    """
+
+    def __init__(self, jobs: list, feed_state=None, min_interval: float = 60.0,
+                 max_interval: float = 3600.0, default_interval: float = 300.0,
+                 backoff: float = 1.5, max_concurrent: int = 10, state_flush_interval: float = 60.0,
+                 on_flush=None):
+        self.jobs = jobs
+        self.feed_state = feed_state
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.default_interval = default_interval
+        self.backoff = backoff
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.state_flush_interval = state_flush_interval
+        self.on_flush = on_flush
+        self.queue = []
+        self.counter = itertools.count()
+        self.wakeup = asyncio.Event()
+        self.running = set()
+
+    def initial_interval(self, job: FeedJob) -> float:
+        stored = self.feed_state.poll_interval(job.url) if self.feed_state is not None else None
+        return min(max(stored or self.default_interval, self.min_interval), self.max_interval)
+
+    def schedule(self, job: FeedJob, delay: float):
+        heapq.heappush(self.queue, (time.monotonic() + delay, next(self.counter), job))
+        self.wakeup.set()
+
+    def adapt(self, job: FeedJob, new_items: int):
+        if new_items > 0:
+            job.interval = max(self.min_interval, job.interval / 2)
+        else:
+            job.interval = min(self.max_interval, job.interval * self.backoff)
+
+        if self.feed_state is not None:
+            self.feed_state.set_poll_interval(job.url, job.interval)
+
+    async def run_job(self, job: FeedJob):
+        new_items = 0
+        try:
+            async with self.semaphore:
+                new_items = await job.poll()
+        except Exception as e:
+            logger.error(f"Polling {job} failed: {e}")
+
+        self.adapt(job, new_items)
+        logger.info(f"{job}: {new_items} new, next poll in {job.interval:.0f}s")
+        self.schedule(job, job.interval)
+
+    async def run_forever(self):
+        # Spread the first polls over the smallest interval instead of firing everything at once
+        for i, job in enumerate(self.jobs):
+            job.interval = self.initial_interval(job)
+            self.schedule(job, self.min_interval * i / max(len(self.jobs), 1))
+
+        last_flush = time.monotonic()
+        while True:
+            now = time.monotonic()
+            while self.queue and self.queue[0][0] <= now:
+                _, _, job = heapq.heappop(self.queue)
+                task = asyncio.create_task(self.run_job(job))
+                self.running.add(task)
+                task.add_done_callback(self.running.discard)
+
+            if now - last_flush >= self.state_flush_interval:
+                if self.feed_state is not None:
+                    await self.feed_state.save()
+                if self.on_flush is not None:
+                    try:
+                        await self.on_flush()
+                    except Exception as e:
+                        logger.error(f"Flush hook failed: {e}")
+                last_flush = now
+
+            delay = self.queue[0][0] - now if self.queue else self.state_flush_interval
+            self.wakeup.clear()
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=min(delay, self.state_flush_interval))
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,114 @@
+from django.db import connection
+from django.db.models import Q
+from feed.models import NewsArticleModel
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+MAX_PAGE_SIZE = 100
+
+_TOKEN = re.compile(r"\w+\*?", re.UNICODE)
+
+# Must match the expression of feed_article_search_idx (migration 0008)
+# character for character or Postgres won't use the index
+_PG_DOCUMENT = (
+    "(setweight(to_tsvector('english', coalesce(a.title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(a.full_content, '')), 'B'))"
+)
+
+_SQLITE_SEARCH = """
+    SELECT a.id, a.title, a.link, a.source, a.published,
+           bm25(feed_article_fts, 10.0, 1.0) AS rank,
+           snippet(feed_article_fts, 1, '<mark>', '</mark>', '…', 24) AS snippet
+    FROM feed_article_fts
+    JOIN feed_newsarticlemodel a ON a.id = feed_article_fts.rowid
+    WHERE feed_article_fts MATCH %s {source_filter}
+    ORDER BY rank
+    LIMIT %s OFFSET %s
+"""
+
+_PG_SEARCH = f"""
+    SELECT a.id, a.title, a.link, a.source, a.published,
+           -ts_rank_cd({_PG_DOCUMENT}, query) AS rank,
+           ts_headline('english', a.full_content, query,
+                       'StartSel=<mark>, StopSel=</mark>, MaxFragments=1, MaxWords=24') AS snippet
+    FROM feed_newsarticlemodel a, websearch_to_tsquery('english', %s) query
+    WHERE {_PG_DOCUMENT} @@ query {{source_filter}}
+    ORDER BY rank
+    LIMIT %s OFFSET %s
+"""
+
+_COLUMNS = ("id", "title", "link", "source", "published", "rank", "snippet")
+
+
+def fts_query(text: str) -> str:
+    """User input as an FTS5 query: every word must match, ``word*`` is a prefix.
+
+    Terms are quoted so FTS5 operators and punctuation in the input can
+    never produce a syntax error.
+    """
+    terms = []
+    for token in _TOKEN.findall(text or ""):
+        if token.endswith("*"):
+            terms.append(f'"{token[:-1]}"*')
+        else:
+            terms.append(f'"{token}"')
+    return " ".join(terms)
+
+
+def search_articles(query: str, page: int = 1, page_size: int = 20, source: str = None) -> dict:
+    """Articles matching every word of ``query``, best match first.
+
+    Uses the FTS5 table on SQLite and the tsvector index on Postgres, any
+    other backend gets an unranked LIKE search ordered by date.
+    """
+    page = max(1, page)
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+    offset = (page - 1) * page_size
+
+    vendor = connection.vendor
+    if vendor == "sqlite":
+        match = fts_query(query)
+        rows = _search_sql(_SQLITE_SEARCH, match, source, page_size, offset) if match else []
+    elif vendor == "postgresql":
+        rows = _search_sql(_PG_SEARCH, query, source, page_size, offset) if query.strip() else []
+    else:
+        rows = _search_like(query, source, page_size, offset)
+
+    # One extra row was fetched to know whether another page exists
+    return {
+        "query": query,
+        "page": page,
+        "page_size": page_size,
+        "has_next": len(rows) > page_size,
+        "results": rows[:page_size],
+    }
+
+
+def _search_sql(template: str, match: str, source: str, limit: int, offset: int) -> list[dict]:
+    params = [match]
+    source_filter = ""
+    if source:
+        source_filter = "AND a.source = %s"
+        params.append(source)
+    params += [limit + 1, offset]
+
+    with connection.cursor() as cursor:
+        cursor.execute(template.format(source_filter=source_filter), params)
+        return [dict(zip(_COLUMNS, row)) for row in cursor.fetchall()]
+
+
+def _search_like(query: str, source: str, limit: int, offset: int) -> list[dict]:
+    terms = [token.rstrip("*") for token in _TOKEN.findall(query or "")]
+    if not terms:
+        return []
+
+    queryset = NewsArticleModel.objects.all()
+    for term in terms:
+        queryset = queryset.filter(Q(title__icontains=term) | Q(full_content__icontains=term))
+    if source:
+        queryset = queryset.filter(source=source)
+
+    rows = queryset.order_by("-published", "-id").values("id", "title", "link", "source", "published")
+    return [{**row, "rank": None, "snippet": None} for row in rows[offset:offset + limit + 1]]
@@ -1,3 +1,863 @@
-from django.test import TestCase
+from datetime import date, datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+import asyncio
+import json
+import tempfile
+import time
+import unittest
 
-# Create your tests here.
+from django.conf import settings
+from django.db import connection
+import httpx
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from feed.entities import AhoCorasick, EntityMatcher
+from feed.management.commands.run_scraper import Command
+from feed import fingerprint
+from feed.scraper import dates
+from feed.scraper.archive import ArchiveTransport, PageArchive
+from feed.scraper.extraction import ExtractionEngine, ExtractorRouter
+from feed.scraper.json_ld import JsonLdIndex
+from feed.scraper.retry import CircuitBreaker, CircuitOpenError, RetryPolicy
+from feed.scraper.rss_scraper import RssScraper
+from feed.scraper.sitemap_scraper import SitemapScraper
+from feed.scraper.host_limiter import HostLimiter, HostState, parse_retry_after
+from feed.scraper.http_client import ScraperHttpClient
+from feed.scraper.urls import canonicalize_url
+from feed.metrics import metrics
+from feed.models import ArticleFingerprintBand, DuplicateArticle, NewsArticleModel
+from feed.services.article_pipeline import scrape_article
+from feed.services.article_queries import articles_version, cached, invalidate_article_cache
+from feed.services.feed_state import FeedStateStore
+from feed.services.ingest_pipeline import ArticleWriter
+from feed.services.dedup import _split_duplicates, _store_fingerprints
+from feed.services.search import fts_query, search_articles
+from feed.services.saving_to_db import _save_articles, _save_articles_bulk, normalize_published
+
+# Saving articles bumps the cache version, tests must never touch the project's real cache
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+class JsonLdIndexTests(SimpleTestCase):
+    def index(self, *blocks):
+        return JsonLdIndex(json.dumps(block) for block in blocks)
+
+    def test_fields_come_from_article_objects_in_graph(self):
+        index = self.index({"@graph": [
+            {"@type": "WebSite", "name": "Example News"},
+            {"@type": "NewsArticle", "headline": "Rates held", "datePublished": "2024-05-01",
+             "author": [{"@type": "Person", "name": "A. Writer"}, "B. Writer"]},
+        ]})
+        self.assertEqual(index.text("headline"), "Rates held")
+        self.assertEqual(index.text("datePublished"), "2024-05-01")
+        self.assertEqual(index.authors(), ["A. Writer", "B. Writer"])
+
+    def test_site_objects_never_supply_article_fields(self):
+        index = self.index(
+            {"@type": "WebSite", "name": "Example News"},
+            {"@type": "Organization", "name": "Example Corp"},
+        )
+        self.assertFalse(index)
+        self.assertIsNone(index.text("name"))
+        self.assertIsNone(index.text("headline"))
+
+    def test_name_is_not_taken_from_nested_objects(self):
+        index = self.index({"@graph": [
+            {"@type": "WebSite", "name": "Example News"},
+            {"@type": "NewsArticle", "articleBody": "Body",
+             "image": {"@type": "ImageObject", "name": "Photo", "datePublished": "2020-01-01"}},
+        ]})
+        self.assertTrue(index)
+        self.assertIsNone(index.text("name"))
+        self.assertIsNone(index.text("datePublished"))
+        self.assertEqual(index.text("articleBody"), "Body")
+
+    def test_invalid_blocks_are_skipped(self):
+        index = JsonLdIndex(["{not json", json.dumps({"@type": ["BlogPosting"], "headline": "Post"})])
+        self.assertEqual(index.text("headline"), "Post")
+
+
+class ExtractorRouterTests(SimpleTestCase):
+    def router(self, **stats):
+        return ExtractorRouter(
+            {("site", stage): {"attempts": attempts, "fields": complete * 3, "complete": complete}
+             for stage, (attempts, complete) in stats.items()},
+            explore_rate=0.0,
+        )
+
+    def test_cheap_stage_that_usually_completes_stays_first(self):
+        # trafilatura only ever ran on the pages json_ld couldn't finish
+        router = self.router(json_ld=(100, 90), trafilatura=(10, 10))
+        self.assertEqual(router.order_for("site")[0], "json_ld")
+
+    def test_heavier_stage_goes_first_when_cheap_ones_fall_short(self):
+        router = self.router(json_ld=(50, 0), custom_selectors=(50, 0), trafilatura=(50, 48))
+        self.assertEqual(router.order_for("site")[0], "trafilatura")
+
+    def test_default_order_without_enough_history(self):
+        router = self.router(trafilatura=(2, 2))
+        self.assertEqual(router.order_for("site"), ExtractionEngine.DEFAULT_STAGES)
+
+    def test_pinned_stage_goes_first(self):
+        router = self.router(json_ld=(100, 100))
+        self.assertEqual(router.order_for("site", pinned="newspaper")[0], "newspaper")
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class SaveArticlesBulkTests(TestCase):
+    def article(self, n, **extra):
+        return {"source": "site", "title": f"Title {n}", "link": f"https://example.com/{n}",
+                "published": "2024-05-01", "full_content": "Body", **extra}
+
+    def test_bad_row_only_fails_itself(self):
+        results = _save_articles_bulk(
+            [self.article(1), self.article(2, unknown_field="x"), self.article(3)], batch_size=10
+        )
+        self.assertEqual(len(results["saved"]), 2)
+        self.assertEqual([failed["data"]["title"] for failed in results["failed"]], ["Title 2"])
+        self.assertEqual(NewsArticleModel.objects.count(), 2)
+
+    def test_published_is_normalized_before_saving(self):
+        results = _save_articles_bulk(
+            [self.article(1, published="2024-05-01T10:30:00+02:00"), self.article(2, published="soon")],
+            batch_size=10,
+        )
+        self.assertEqual(results["saved"][0]["object"].published, date(2024, 5, 1))
+        self.assertIn("published", results["failed"][0]["error"])
+
+    def test_cache_is_only_invalidated_by_changed_rows(self):
+        _save_articles([self.article(1)])
+        version = articles_version()
+
+        # Already stored, nothing the dashboard shows has changed
+        _save_articles([self.article(1)])
+        _save_articles_bulk([self.article(1)], batch_size=10)
+        self.assertEqual(articles_version(), version)
+
+        _save_articles_bulk([self.article(2)], batch_size=10)
+        self.assertGreater(articles_version(), version)
+        version = articles_version()
+        _save_articles_bulk([self.article(1)], batch_size=10, overwrite=True)
+        self.assertGreater(articles_version(), version)
+
+    def test_normalize_published(self):
+        self.assertEqual(normalize_published(datetime(2024, 5, 1, 23, 0)), date(2024, 5, 1))
+        self.assertEqual(normalize_published(date(2024, 5, 1)), date(2024, 5, 1))
+        self.assertEqual(normalize_published(" 2024-05-01 "), date(2024, 5, 1))
+        self.assertIsNone(normalize_published("2024-13-45"))
+        self.assertIsNone(normalize_published(None))
+
+
+class ParseDateStringTests(SimpleTestCase):
+    def setUp(self):
+        dates._format_cache.clear()
+
+    def test_unambiguous_format_is_cached_per_source(self):
+        self.assertEqual(dates.parse_date_string("May 1, 2024", "site"), datetime(2024, 5, 1))
+        self.assertEqual(dates._format_cache["site"], "%B %d, %Y")
+
+    def test_ambiguous_formats_are_never_cached(self):
+        # Only day-first fits, it must not decide how later dates of the source read
+        self.assertEqual(dates.parse_date_string("25/04/2024", "site"), datetime(2024, 4, 25))
+        self.assertNotIn("site", dates._format_cache)
+        self.assertEqual(dates.parse_date_string("04/05/2024", "site"), datetime(2024, 4, 5))
+
+
+class AhoCorasickTests(SimpleTestCase):
+    def test_reports_every_overlapping_occurrence(self):
+        automaton = AhoCorasick()
+        for word in ("he", "she", "his", "hers"):
+            automaton.add_word(word, word)
+        automaton.make_automaton()
+        self.assertEqual(
+            sorted(automaton.iter("ushers")),
+            [(3, "he"), (3, "she"), (5, "hers")],
+        )
+
+
+class EntityMatcherTests(SimpleTestCase):
+    def setUp(self):
+        self.matcher = EntityMatcher([
+            {"symbol": "AAPL", "name": "Apple", "aliases": ["Apple Inc"]},
+            {"symbol": "GE", "name": "General Electric"},
+        ])
+
+    def test_names_match_case_insensitively_on_word_boundaries(self):
+        self.assertEqual(self.matcher.match("APPLE beat estimates, apple pie did not"), {"AAPL": 2})
+        self.assertEqual(self.matcher.match("Pineapples and Applebee's"), {})
+
+    def test_name_and_longer_alias_at_one_place_are_one_mention(self):
+        self.assertEqual(self.matcher.match("Apple Inc. said"), {"AAPL": 1})
+
+    def test_symbols_match_bare_or_as_cashtags(self):
+        self.assertEqual(self.matcher.match("AAPL and $AAPL, not AAPLX"), {"AAPL": 2})
+
+    def test_short_symbols_only_match_as_cashtags(self):
+        self.assertEqual(self.matcher.match("GE is up, ge is a word, $GE too"), {"GE": 1})
+
+    def test_counts_across_texts(self):
+        self.assertEqual(self.matcher.match("Apple", None, "General Electric and Apple"), {"AAPL": 2, "GE": 1})
+
+
+STORY = (
+    "The central bank held interest rates steady on Wednesday, saying inflation was easing but remained "
+    "above its target, and signalled that cuts could come later this year if price pressures kept cooling. "
+    "Markets had widely expected the decision, and bond yields moved little after the announcement."
+)
+SYNDICATED = STORY + " Reporting by Jane Doe."
+UNRELATED = (
+    "Shares of the chipmaker jumped after it reported record quarterly revenue driven by demand for "
+    "data center processors."
+)
+
+
+class MinHashTests(SimpleTestCase):
+    def test_signature_shape(self):
+        signature = fingerprint.minhash(STORY)
+        self.assertEqual(len(signature), fingerprint.NUM_PERM)
+        self.assertEqual(signature, fingerprint.minhash(STORY.upper()))
+        self.assertIsNone(fingerprint.minhash(""))
+        self.assertIsNone(fingerprint.minhash(None))
+
+    def test_similarity_tracks_overlap(self):
+        story = fingerprint.minhash(STORY)
+        self.assertEqual(fingerprint.similarity(story, story), 1.0)
+        self.assertGreaterEqual(
+            fingerprint.similarity(story, fingerprint.minhash(SYNDICATED)), fingerprint.SIMILARITY_THRESHOLD
+        )
+        self.assertLess(fingerprint.similarity(story, fingerprint.minhash(UNRELATED)), 0.2)
+
+    def test_band_keys(self):
+        story = fingerprint.minhash(STORY)
+        keys = fingerprint.band_keys(story)
+        self.assertEqual(len(keys), fingerprint.BANDS)
+        self.assertTrue(all(-2 ** 63 <= key < 2 ** 63 for key in keys))
+        # Near-duplicates share buckets, unrelated stories don't
+        self.assertTrue(set(keys) & set(fingerprint.band_keys(fingerprint.minhash(SYNDICATED))))
+        self.assertFalse(set(keys) & set(fingerprint.band_keys(fingerprint.minhash(UNRELATED))))
+
+    def test_equal_rows_in_different_bands_get_different_keys(self):
+        keys = fingerprint.band_keys([7] * fingerprint.NUM_PERM)
+        self.assertEqual(len(set(keys)), fingerprint.BANDS)
+
+    def test_bytes_round_trip(self):
+        story = fingerprint.minhash(STORY)
+        self.assertEqual(fingerprint.from_bytes(memoryview(fingerprint.to_bytes(story))), story)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class SplitDuplicatesTests(TestCase):
+    def article(self, n, text):
+        return {"source": "site", "title": f"Title {n}", "link": f"https://example.com/{n}",
+                "published": date(2024, 5, 1), "full_content": text}
+
+    def test_near_duplicate_within_batch(self):
+        unique, duplicates = _split_duplicates([
+            self.article(1, STORY), self.article(2, SYNDICATED), self.article(3, UNRELATED),
+        ])
+        self.assertEqual([article["link"] for article in unique], ["https://example.com/1", "https://example.com/3"])
+        self.assertEqual(duplicates[0]["canonical_link"], "https://example.com/1")
+        self.assertIsNotNone(unique[0]["fingerprint"])
+
+    def test_near_duplicate_of_stored_article(self):
+        stored = self.article(1, STORY)
+        stored["fingerprint"] = fingerprint.to_bytes(fingerprint.minhash(STORY))
+        article = NewsArticleModel.objects.create(**stored)
+        ArticleFingerprintBand.objects.bulk_create(
+            ArticleFingerprintBand(article=article, key=key)
+            for key in fingerprint.band_keys(fingerprint.minhash(STORY))
+        )
+
+        unique, duplicates = _split_duplicates([self.article(2, SYNDICATED), self.article(1, STORY)])
+        self.assertEqual([duplicate["article"]["link"] for duplicate in duplicates], ["https://example.com/2"])
+        # Re-extracting the stored article itself is not a duplicate
+        self.assertEqual([article["link"] for article in unique], ["https://example.com/1"])
+
+    def test_duplicates_store_normalized_published_dates(self):
+        story = self.article(1, STORY)
+        story["fingerprint"] = fingerprint.to_bytes(fingerprint.minhash(STORY))
+        canonical = NewsArticleModel.objects.create(**story)
+        duplicates = [
+            {"article": dict(self.article(2, SYNDICATED), published="2024-01-01T10:00:00"),
+             "canonical_link": canonical.link, "similarity": 0.9},
+            {"article": dict(self.article(3, SYNDICATED), published="last Tuesday"),
+             "canonical_link": canonical.link, "similarity": 0.9},
+        ]
+
+        _store_fingerprints([canonical], duplicates)
+
+        self.assertEqual(
+            dict(DuplicateArticle.objects.values_list("link", "published")),
+            {"https://example.com/2": date(2024, 1, 1), "https://example.com/3": None},
+        )
+        self.assertEqual(ArticleFingerprintBand.objects.filter(article=canonical).count(), fingerprint.BANDS)
+
+
+class CanonicalizeUrlTests(SimpleTestCase):
+    def test_spellings_of_one_page_collapse(self):
+        expected = "https://example.com/news/story?a=1&b=2"
+        for url in (
+            "http://Example.COM:80/news/story/?b=2&a=1",
+            "https://example.com:443/news/story?a=1&b=2#comments",
+            "https://example.com./news/story?utm_source=rss&b=2&fbclid=x&a=1&ref=home",
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(canonicalize_url(url), expected)
+
+    def test_path_case_and_content_params_are_kept(self):
+        self.assertEqual(canonicalize_url("https://example.com/News?id=3&q="), "https://example.com/News?id=3&q=")
+
+    def test_relative_links_resolve_against_base(self):
+        self.assertEqual(
+            canonicalize_url("../story?utm_medium=x", base="https://example.com/news/today/"),
+            "https://example.com/news/story",
+        )
+
+    def test_root_keeps_its_slash(self):
+        self.assertEqual(canonicalize_url("http://example.com"), "https://example.com/")
+
+    def test_custom_port_keeps_its_scheme(self):
+        self.assertEqual(canonicalize_url("http://example.com:8080/a/"), "http://example.com:8080/a")
+
+    def test_https_upgrade_can_be_disabled(self):
+        self.assertEqual(canonicalize_url("http://example.com/a", prefer_https=False), "http://example.com/a")
+
+    def test_ipv6_hosts_keep_their_brackets(self):
+        self.assertEqual(canonicalize_url("http://[::1]:8000/x"), "http://[::1]:8000/x")
+
+    def test_other_urls_are_only_stripped(self):
+        self.assertEqual(canonicalize_url("  mailto:news@example.com "), "mailto:news@example.com")
+        self.assertEqual(canonicalize_url("http://[::1"), "http://[::1")
+        self.assertIsNone(canonicalize_url(None))
+
+
+class ArticleCacheVersionTests(SimpleTestCase):
+    """Runs on the configured cache backend, only moved to a temporary directory"""
+
+    def setUp(self):
+        location = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(CACHES={"default": {**settings.CACHES["default"], "LOCATION": location}}))
+
+    def test_version_outlives_the_default_timeout(self):
+        invalidate_article_cache()
+        version = articles_version()
+        later = time.time() + 24 * 3600
+        with mock.patch("django.core.cache.backends.filebased.time.time", return_value=later):
+            self.assertEqual(articles_version(), version)
+
+    def test_versions_never_repeat(self):
+        seen = [articles_version()]
+        for _ in range(3):
+            invalidate_article_cache()
+            seen.append(articles_version())
+        # A lost version key starts over above every earlier version
+        cache.delete("articles:version")
+        seen.append(articles_version())
+        self.assertEqual(seen, sorted(set(seen)))
+
+    def test_invalidation_retires_cached_responses(self):
+        build = mock.Mock(side_effect=[{"page": 1}, {"page": 2}])
+        self.assertEqual(cached("list", {"limit": 20}, build), {"page": 1})
+        self.assertEqual(cached("list", {"limit": 20}, build), {"page": 1})
+        invalidate_article_cache()
+        self.assertEqual(cached("list", {"limit": 20}, build), {"page": 2})
+
+
+class ScrapeArticleTests(SimpleTestCase):
+    def setUp(self):
+        metrics.reset()
+
+    async def test_refused_claim_counts_as_skipped_not_failed(self):
+        link = "https://example.com/story"
+        async with ScraperHttpClient() as client:
+            client.claim(link)
+            self.assertIsNone(await scrape_article(link, {"name": "site"}, client))
+
+        self.assertEqual(metrics.sources["site"]["skipped"], 1)
+        self.assertEqual(metrics.sources["site"]["failed"], 0)
+
+
+class DaemonJobTests(SimpleTestCase):
+    def test_feed_jobs_use_the_url_validators_are_stored_under(self):
+        command = Command()
+        [rss_job] = command._build_jobs({"name": "a", "type": "rss", "rss_feeds": ["http://bench0.test/rss.xml"]})
+        [sitemap_job] = command._build_jobs({"name": "b", "type": "sitemap", "sitemap": "http://bench1.test/sitemap.xml"})
+
+        self.assertEqual(rss_job.url, RssScraper("http://bench0.test/rss.xml", "a").feed_url)
+        self.assertEqual(sitemap_job.url, SitemapScraper("http://bench1.test/sitemap.xml").feed_url)
+        self.assertEqual(rss_job.url, "https://bench0.test/rss.xml")
+
+
+SITEMAP = "https://example.com/sitemap.xml"
+
+
+def sitemap_entry(day: int, n: int = 0, sitemap: str = SITEMAP) -> dict:
+    lastmod = datetime(2024, 5, day, tzinfo=timezone.utc)
+    return {"link": f"https://example.com/{day}/{n}", "published": lastmod.isoformat(),
+            "lastmod": lastmod, "sitemap": sitemap}
+
+
+class SitemapBacklogTests(SimpleTestCase):
+    def setUp(self):
+        self.client = SimpleNamespace(feed_state=FeedStateStore())
+        state = self.client.feed_state.get(SITEMAP)
+        state.etag = '"v1"'
+
+    async def collect(self, entries, limit=None, **kwargs):
+        scraper = SitemapScraper(SITEMAP, **kwargs)
+        scraper.crawl_sitemap = mock.AsyncMock(return_value=entries)
+        return [entry["link"] for entry in await scraper.collect_new_articles(self.client, limit)]
+
+    async def test_newest_entries_go_first(self):
+        links = await self.collect([sitemap_entry(day) for day in range(1, 6)], limit=2)
+        self.assertEqual(links, ["https://example.com/5/0", "https://example.com/4/0"])
+        # The older backlog stays above the mark and the next run refetches the sitemap
+        self.assertEqual(self.client.feed_state.watermark(SITEMAP), datetime(2024, 5, 1, tzinfo=timezone.utc))
+        self.assertEqual(self.client.feed_state.conditional_headers(SITEMAP), {})
+
+    async def test_oldest_first_moves_the_mark_up_to_the_cut(self):
+        links = await self.collect([sitemap_entry(day) for day in range(1, 6)], limit=2, newest_first=False)
+        self.assertEqual(links, ["https://example.com/1/0", "https://example.com/2/0"])
+        self.assertEqual(self.client.feed_state.watermark(SITEMAP), datetime(2024, 5, 2, tzinfo=timezone.utc))
+
+    async def test_mark_never_passes_a_cut_entry_with_the_same_lastmod(self):
+        await self.collect([sitemap_entry(3, n) for n in range(3)], limit=1, newest_first=False)
+        self.assertEqual(self.client.feed_state.watermark(SITEMAP), datetime(2024, 5, 3, tzinfo=timezone.utc))
+
+    async def test_known_links_are_dropped_before_the_limit(self):
+        known = {"https://example.com/5/0"}
+        links = await self.collect([sitemap_entry(day) for day in range(1, 6)], limit=1, known_links=known)
+        self.assertEqual(links, ["https://example.com/4/0"])
+
+    async def test_without_a_cut_the_mark_reaches_the_newest_entry(self):
+        links = await self.collect([sitemap_entry(day) for day in range(1, 4)], limit=5)
+        self.assertEqual(len(links), 3)
+        self.assertEqual(self.client.feed_state.watermark(SITEMAP), datetime(2024, 5, 3, tzinfo=timezone.utc))
+        self.assertEqual(self.client.feed_state.conditional_headers(SITEMAP), {"If-None-Match": '"v1"'})
+
+    async def test_entries_at_the_mark_stay_eligible(self):
+        self.client.feed_state.advance_watermark(SITEMAP, datetime(2024, 5, 3, tzinfo=timezone.utc))
+        scraper = SitemapScraper(SITEMAP)
+        urls = [{key: value for key, value in sitemap_entry(day, n).items() if key != "sitemap"}
+                for day, n in ((2, 0), (3, 0), (3, 1), (4, 0))]
+        scraper.stream_sitemap = mock.AsyncMock(return_value=(urls, []))
+
+        entries = await scraper.crawl_sitemap(self.client, SITEMAP)
+        self.assertEqual(
+            [entry["link"] for entry in entries],
+            ["https://example.com/3/0", "https://example.com/3/1", "https://example.com/4/0"],
+        )
+
+
+class RetryPolicyTests(SimpleTestCase):
+    def test_backoff_grows_exponentially_up_to_the_cap(self):
+        policy = RetryPolicy(base_delay=0.5, max_delay=15.0)
+        with mock.patch("feed.scraper.retry.random.uniform", side_effect=lambda low, high: high):
+            self.assertEqual([policy.delay(attempt) for attempt in range(7)], [0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 15.0])
+
+    def test_retry_after_is_a_capped_floor(self):
+        policy = RetryPolicy(base_delay=0.5, max_delay=15.0)
+        with mock.patch("feed.scraper.retry.random.uniform", side_effect=lambda low, high: low):
+            self.assertEqual(policy.delay(0), 0)
+            self.assertEqual(policy.delay(0, retry_after=4.0), 4.0)
+            self.assertEqual(policy.delay(0, retry_after=120.0), 15.0)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("3"), 3.0)
+        self.assertEqual(parse_retry_after("-1"), 0.0)
+        self.assertIsNone(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"))
+        self.assertIsNone(parse_retry_after(None))
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = self.enterContext(mock.patch("feed.scraper.retry.time.monotonic", return_value=100.0))
+        self.breaker = CircuitBreaker(failure_threshold=2, cooldown=10.0)
+
+    def open_circuit(self):
+        self.breaker.record_failure("host")
+        self.breaker.record_failure("host")
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.record_failure("host")
+        self.assertFalse(self.breaker.check("host"))
+        self.breaker.record_failure("host")
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.check("host")
+        self.assertFalse(self.breaker.check("other"))
+
+    def test_success_resets_the_failure_count(self):
+        self.breaker.record_failure("host")
+        self.breaker.record_success("host")
+        self.breaker.record_failure("host")
+        self.assertFalse(self.breaker.check("host"))
+
+    def test_half_open_lets_exactly_one_trial_through(self):
+        self.open_circuit()
+        self.clock.return_value = 111.0
+        self.assertTrue(self.breaker.check("host"))
+        for _ in range(3):
+            with self.assertRaises(CircuitOpenError):
+                self.breaker.check("host")
+
+        self.breaker.record_success("host")
+        self.assertFalse(self.breaker.check("host"))
+        self.assertFalse(self.breaker.check("host"))
+
+    def test_failed_trial_reopens_straight_away(self):
+        self.open_circuit()
+        self.clock.return_value = 111.0
+        self.breaker.check("host")
+        self.breaker.record_failure("host")
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.check("host")
+        self.clock.return_value = 122.0
+        self.assertTrue(self.breaker.check("host"))
+
+    def test_released_or_stale_trials_make_room_for_another(self):
+        self.open_circuit()
+        self.clock.return_value = 111.0
+        self.breaker.check("host")
+        self.breaker.release_trial("host")
+        self.assertTrue(self.breaker.check("host"))
+
+        # Never reported back
+        self.clock.return_value = 122.0
+        self.assertTrue(self.breaker.check("host"))
+
+
+class RequestRetryTests(SimpleTestCase):
+    url = "https://example.com/story"
+
+    def setUp(self):
+        metrics.reset()
+        self.calls = 0
+
+    def client(self, handler, attempts=3, threshold=5):
+        def counting(request):
+            self.calls += 1
+            return handler(request)
+
+        return ScraperHttpClient(
+            transport=httpx.MockTransport(counting),
+            retry=RetryPolicy(attempts=attempts, base_delay=0.0),
+            breaker=CircuitBreaker(failure_threshold=threshold, cooldown=60.0),
+        )
+
+    async def test_retryable_statuses_are_retried_until_success(self):
+        statuses = iter([503, 502, 200])
+        async with self.client(lambda request: httpx.Response(next(statuses))) as client:
+            response = await client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.calls, 3)
+        self.assertEqual(metrics.get("retries"), 2)
+
+    async def test_last_response_is_returned_when_attempts_run_out(self):
+        async with self.client(lambda request: httpx.Response(503)) as client:
+            response = await client.get(self.url)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.calls, 3)
+
+    async def test_other_statuses_are_not_retried(self):
+        async with self.client(lambda request: httpx.Response(404)) as client:
+            response = await client.get(self.url)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.calls, 1)
+
+    async def test_transport_errors_are_raised_after_the_last_attempt(self):
+        def refuse(request):
+            raise httpx.ConnectError("refused", request=request)
+
+        async with self.client(refuse) as client:
+            with self.assertRaises(httpx.ConnectError):
+                await client.get(self.url)
+        self.assertEqual(self.calls, 3)
+
+    async def test_open_circuit_fails_fast(self):
+        def refuse(request):
+            raise httpx.ConnectError("refused", request=request)
+
+        async with self.client(refuse, attempts=1, threshold=2) as client:
+            for _ in range(2):
+                with self.assertRaises(httpx.ConnectError):
+                    await client.get(self.url)
+            with self.assertRaises(CircuitOpenError):
+                await client.get(self.url)
+        self.assertEqual(self.calls, 2)
+
+    async def test_half_open_sends_one_trial_for_concurrent_callers(self):
+        answer = asyncio.Event()
+
+        async def slow(request):
+            await answer.wait()
+            return httpx.Response(200)
+
+        async with self.client(slow, attempts=1) as client:
+            client.breaker.failures["example.com"] = 5
+            # Opened long enough ago that the cooldown is over
+            client.breaker.opened_until["example.com"] = 0.0
+
+            tasks = [asyncio.create_task(client.get(self.url)) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            answer.set()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(sorted(type(result).__name__ for result in results),
+                         ["CircuitOpenError", "CircuitOpenError", "Response"])
+        self.assertNotIn("example.com", client.breaker.opened_until)
+
+
+class TokenBucketTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = self.enterContext(mock.patch("feed.scraper.host_limiter.time.monotonic", return_value=100.0))
+        self.state = HostState(rate=10.0, burst=2, concurrency=4)
+
+    def test_burst_then_rate(self):
+        self.assertEqual(self.state.take_token(), 0.0)
+        self.assertEqual(self.state.take_token(), 0.0)
+        self.assertAlmostEqual(self.state.take_token(), 0.1)
+
+        self.clock.return_value = 100.2
+        self.assertEqual(self.state.take_token(), 0.0)
+
+    def test_refill_stops_at_the_burst(self):
+        self.clock.return_value = 1000.0
+        for _ in range(2):
+            self.assertEqual(self.state.take_token(), 0.0)
+        self.assertGreater(self.state.take_token(), 0.0)
+
+    def test_pause_overrides_tokens(self):
+        self.state.paused_until = 105.0
+        self.assertEqual(self.state.take_token(), 5.0)
+
+
+class HostLimiterTests(SimpleTestCase):
+    def limiter(self, **kwargs):
+        return HostLimiter(**{"initial_concurrency": 4, "max_concurrency": 8, **kwargs})
+
+    async def test_healthy_responses_grow_the_window_additively(self):
+        limiter = self.limiter()
+        await limiter.acquire("host")
+        await limiter.release("host", 0.1, status=200)
+        self.assertAlmostEqual(limiter.state("host").limit, 4.25)
+
+    async def test_errors_and_throttling_halve_the_window(self):
+        limiter = self.limiter()
+        for kwargs in ({"error": True}, {"status": 429}, {"status": 503, "retry_after": 30.0}):
+            await limiter.acquire("host")
+            await limiter.release("host", 0.1, **kwargs)
+        state = limiter.state("host")
+        self.assertEqual(state.limit, 1)
+        self.assertGreater(state.paused_until, time.monotonic() + 25)
+
+    async def test_slow_responses_halve_the_window(self):
+        limiter = self.limiter(latency_target=1.0)
+        await limiter.acquire("host")
+        await limiter.release("host", 5.0, status=200)
+        self.assertEqual(limiter.state("host").limit, 2)
+
+    async def test_window_bounds_concurrent_requests(self):
+        limiter = self.limiter(initial_concurrency=1)
+        await limiter.acquire("host")
+        waiter = asyncio.create_task(limiter.acquire("host"))
+        await asyncio.sleep(0.01)
+        self.assertFalse(waiter.done())
+
+        await limiter.release("host", 0.1, status=404)
+        await asyncio.wait_for(waiter, 1)
+        self.assertEqual(limiter.state("host").in_flight, 1)
+
+    async def test_cancelled_token_wait_gives_the_slot_back(self):
+        limiter = self.limiter(rate=0.01, burst=1)
+        await limiter.acquire("host")
+        await limiter.release("host", 0.1, status=404)
+
+        waiter = asyncio.create_task(limiter.acquire("host"))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+        self.assertEqual(limiter.state("host").in_flight, 0)
+
+
+class ArticleWriterTests(SimpleTestCase):
+    def setUp(self):
+        self.batches = []
+
+    async def save(self, batch):
+        self.batches.append(list(batch))
+
+    async def test_flushes_every_full_batch(self):
+        async with ArticleWriter(self.save, batch_size=2, flush_interval=60.0) as writer:
+            for n in range(5):
+                await writer.put(n)
+            await asyncio.sleep(0.01)
+            self.assertEqual(self.batches, [[0, 1], [2, 3]])
+        self.assertEqual(self.batches, [[0, 1], [2, 3], [4]])
+        self.assertEqual(writer.flushed, 5)
+
+    async def test_flushes_a_partial_batch_after_the_interval(self):
+        async with ArticleWriter(self.save, batch_size=100, flush_interval=0.05) as writer:
+            await writer.put(0)
+            await writer.put(1)
+            await asyncio.sleep(0.2)
+            self.assertEqual(self.batches, [[0, 1]])
+
+    async def test_close_drains_the_queue(self):
+        writer = ArticleWriter(self.save, batch_size=100, flush_interval=60.0)
+        writer.start()
+        for n in range(3):
+            await writer.put(n)
+        await writer.close()
+        self.assertEqual(self.batches, [[0, 1, 2]])
+
+    async def test_full_queue_blocks_put_until_the_writer_catches_up(self):
+        database = asyncio.Event()
+
+        async def slow_save(batch):
+            await database.wait()
+            self.batches.append(list(batch))
+
+        async with ArticleWriter(slow_save, batch_size=1, flush_interval=60.0, max_queue=2) as writer:
+            await writer.put(0)
+            await asyncio.sleep(0.01)
+            # 0 is being saved, 1 and 2 fill the queue
+            await writer.put(1)
+            await writer.put(2)
+            blocked = asyncio.create_task(writer.put(3))
+            await asyncio.sleep(0.01)
+            self.assertFalse(blocked.done())
+
+            database.set()
+            await asyncio.wait_for(blocked, 1)
+        self.assertEqual(self.batches, [[0], [1], [2], [3]])
+
+    async def test_failed_batch_does_not_stop_the_writer(self):
+        async def flaky_save(batch):
+            if batch == [0]:
+                raise RuntimeError("database is locked")
+            self.batches.append(list(batch))
+
+        async with ArticleWriter(flaky_save, batch_size=1, flush_interval=60.0) as writer:
+            await writer.put(0)
+            await writer.put(1)
+        self.assertEqual(self.batches, [[1]])
+        self.assertEqual(writer.flushed, 1)
+
+
+class FtsQueryTests(SimpleTestCase):
+    def test_words_are_quoted_and_prefixes_kept(self):
+        self.assertEqual(fts_query("rate cut*"), '"rate" "cut"*')
+
+    def test_operators_and_punctuation_are_neutralized(self):
+        self.assertEqual(fts_query('rates" OR (NEAR:cut'), '"rates" "OR" "NEAR" "cut"')
+        self.assertEqual(fts_query("*^-"), "")
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "FTS5 triggers are SQLite only")
+class SearchArticlesTests(TestCase):
+    def create(self, n, title, content, source="reuters"):
+        return NewsArticleModel.objects.create(
+            source=source, title=title, link=f"https://example.com/{n}",
+            published=date(2024, 5, n), full_content=content,
+        )
+
+    def titles(self, query, **kwargs):
+        return [row["title"] for row in search_articles(query, **kwargs)["results"]]
+
+    def test_inserted_articles_are_indexed(self):
+        self.create(1, "Fed holds rates", "Inflation keeps cooling.")
+        NewsArticleModel.objects.bulk_create([NewsArticleModel(
+            source="cnbc", title="Oil slips", link="https://example.com/2",
+            published=date(2024, 5, 2), full_content="Crude fell on rates worries.",
+        )])
+        self.assertEqual(self.titles("rates"), ["Fed holds rates", "Oil slips"])
+        self.assertEqual(self.titles("rates", source="cnbc"), ["Oil slips"])
+
+    def test_updates_and_deletes_follow_the_row(self):
+        article = self.create(1, "Fed holds rates", "Inflation keeps cooling.")
+        article.title = "ECB cuts"
+        article.save()
+        self.assertEqual(self.titles("fed"), [])
+        self.assertEqual(self.titles("ecb"), ["ECB cuts"])
+
+        article.delete()
+        self.assertEqual(self.titles("ecb"), [])
+
+    def test_prefix_and_stemmed_matches(self):
+        self.create(1, "Fed holds rates", "Inflation keeps cooling.")
+        self.assertEqual(self.titles("infla*"), ["Fed holds rates"])
+        self.assertEqual(self.titles("holding"), ["Fed holds rates"])
+        self.assertEqual(self.titles("infla"), [])
+
+    def test_punctuation_in_queries_never_raises(self):
+        self.create(1, "AT&T beats", "Shares rose (sharply) after results.")
+        self.assertEqual(self.titles("AT&T"), ["AT&T beats"])
+        self.assertEqual(self.titles('"(sharply'), ["AT&T beats"])
+        self.assertEqual(self.titles("NEAR(shares"), [])
+        self.assertEqual(search_articles("   ")["results"], [])
+
+    def test_pages(self):
+        for n in range(1, 4):
+            self.create(n, f"Rates story {n}", "rates")
+        first = search_articles("rates", page_size=2)
+        second = search_articles("rates", page=2, page_size=2)
+        self.assertTrue(first["has_next"])
+        self.assertFalse(second["has_next"])
+        self.assertEqual(len({row["id"] for row in first["results"] + second["results"]}), 3)
+
+
+class PageArchiveTests(SimpleTestCase):
+    page = b"<html><body>Rates held</body></html>"
+
+    def setUp(self):
+        self.root = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.archive = PageArchive(self.root, codec="gz")
+
+    def test_round_trip_stores_each_body_once(self):
+        digest = self.archive.store("https://example.com/a", self.page, "text/html", source="site")
+        self.assertEqual(self.archive.store("https://example.com/b", self.page, source="site"), digest)
+        self.assertEqual(len(list((self.root / "objects").rglob("*.gz"))), 1)
+
+        reopened = PageArchive(self.root)
+        self.assertEqual(len(reopened), 2)
+        record = reopened.get("https://example.com/a")
+        self.assertEqual((record["codec"], record["content_type"]), ("gz", "text/html"))
+        self.assertEqual(reopened.load(record), self.page)
+        self.assertEqual(sorted(reopened.urls_for("site")), ["https://example.com/a", "https://example.com/b"])
+
+    def test_later_records_win(self):
+        self.archive.store("https://example.com/a", b"old")
+        self.archive.store("https://example.com/a", b"new", status=410)
+        record = PageArchive(self.root).get("https://example.com/a")
+        self.assertEqual(record["status"], 410)
+        self.assertEqual(self.archive.load(record), b"new")
+
+    def test_truncated_last_index_line_is_skipped(self):
+        self.archive.store("https://example.com/a", self.page)
+        segment = next((self.root / "index").glob("*.jsonl"))
+        with segment.open("a", encoding="utf-8") as f:
+            f.write('{"url": "https://example.com/b", "sha2')
+
+        reopened = PageArchive(self.root)
+        self.assertEqual(list(reopened.records), ["https://example.com/a"])
+
+    def test_zstd_falls_back_to_gzip_without_the_package(self):
+        with mock.patch("feed.scraper.archive.module_available", return_value=False):
+            self.assertEqual(PageArchive(self.root, codec="zst").codec, "gz")
+            self.assertEqual(PageArchive(self.root).codec, "gz")
+
+    async def test_transport_replays_stored_pages(self):
+        self.archive.store("https://example.com/a", self.page, "text/html; charset=utf-8", source="site")
+        async with httpx.AsyncClient(transport=ArchiveTransport(PageArchive(self.root))) as client:
+            response = await client.get("https://example.com/a")
+            missing = await client.get("https://example.com/unknown")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, self.page)
+        self.assertEqual(response.headers["Content-Type"], "text/html; charset=utf-8")
+        self.assertEqual(missing.status_code, 404)